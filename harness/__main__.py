@@ -0,0 +1,5 @@
+import sys
+
+from harness import cli
+
+sys.exit(cli.main())
@@ -0,0 +1,187 @@
+import argparse
+import json
+import re
+import sys
+import time
+
+import numpy as np
+
+from harness import store as result_store
+
+# Constants
+LETTERS = "ABCDE"
+DIMENSIONS = ["model", "section", "subtype", "difficulty"]
+# "**C**", "(C)", "C." and the like all count as C
+LETTER_ANSWER = re.compile(r"^\W*([A-E])\W*$")
+
+
+# Index of the A-E letter each distinct value stands for, -1 for anything else.
+# Works on the (small) dictionary so the per-row work is a single gather.
+def letter_codes(values):
+    lookup = np.full(len(values), -1, dtype=np.int64)
+    for i, value in enumerate(values):
+        match = LETTER_ANSWER.match(str(value).upper())
+        if match:
+            lookup[i] = LETTERS.index(match.group(1))
+    return lookup
+
+
+# Combine several code columns into one group id per row; returns the ids and
+# the sizes they were combined with
+def group_ids(table, names):
+    ids = np.zeros(len(table), dtype=np.int64)
+    sizes = []
+    for name in names:
+        size = len(table.values[name])
+        ids = ids * size + table[name].astype(np.int64)
+        sizes.append(size)
+    return ids, sizes
+
+
+def pivot(table, by=DIMENSIONS):
+    ids, sizes = group_ids(table, by)
+    groups, inverse = np.unique(ids, return_inverse=True)
+    total = np.bincount(inverse)
+    correct = np.bincount(inverse, weights=table["is_correct"]).astype(np.int64)
+    failed = np.bincount(inverse, weights=table["failed"]).astype(np.int64)
+
+    codes = np.stack(np.unravel_index(groups, sizes), axis=1) if by else np.zeros((len(groups), 0), dtype=np.int64)
+    rows = []
+    for i, group in enumerate(codes):
+        row = {name: table.values[name][code] for name, code in zip(by, group)}
+        row.update({
+            "correct": int(correct[i]),
+            "total": int(total[i]),
+            "failed": int(failed[i]),
+            "accuracy": round(correct[i] / total[i] * 100, 2)
+        })
+        rows.append(row)
+    return rows
+
+
+# Per model: rows are the correct letter, columns the predicted letter plus
+# a last column for answers that are not a single letter
+def confusion(table):
+    truth = letter_codes(table.values["correct_answer"])[table["correct_answer"]]
+    predicted = letter_codes(table.values["predicted"])[table["predicted"]]
+    predicted = np.where(predicted < 0, len(LETTERS), predicted)
+    keep = truth >= 0
+
+    n_models = len(table.values["model"])
+    width = len(LETTERS) + 1
+    cells = (table["model"][keep].astype(np.int64) * len(LETTERS) + truth[keep]) * width + predicted[keep]
+    counts = np.bincount(cells, minlength=n_models * len(LETTERS) * width).reshape(n_models, len(LETTERS), width)
+    return {model: counts[i].tolist() for i, model in enumerate(table.values["model"]) if counts[i].any()}
+
+
+# Fraction of shared items on which two models gave the same answer. An item is
+# (section, prompt style, question_id, occurrence) so duplicate ids stay apart.
+def agreement(table):
+    n = len(table)
+    model = table["model"].astype(np.int64)
+    item_ids, _ = group_ids(table, ["section", "prompt_style"])
+    item_ids = item_ids * (int(table["question_id"].max(initial=0)) + 1) + table["question_id"]
+
+    # Occurrence of each row within its (model, item) run
+    order = np.lexsort((np.arange(n), item_ids, model))
+    run_key = model[order] * (int(item_ids.max(initial=0)) + 1) + item_ids[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(run_key)) + 1] if n else np.zeros(0, dtype=np.int64)
+    occurrence = np.empty(n, dtype=np.int64)
+    occurrence[order] = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    items, item = np.unique(np.stack([item_ids, occurrence], axis=1), axis=0, return_inverse=True)
+    item = item.ravel()
+    # Letters compare as letters; anything else compares by its exact text
+    letters = letter_codes(table.values["predicted"])
+    answer = np.where(letters[table["predicted"]] >= 0, letters[table["predicted"]],
+                      len(LETTERS) + table["predicted"].astype(np.int64))
+    answer = np.where(table["failed"], -1, answer)
+
+    names = table.values["model"]
+    answers = np.full((len(items), len(names)), -1, dtype=np.int64)
+    answers[item, model] = answer
+
+    pairs = []
+    for a in range(len(names)):
+        for b in range(a + 1, len(names)):
+            both = (answers[:, a] >= 0) & (answers[:, b] >= 0)
+            shared = int(both.sum())
+            if not shared:
+                continue
+            same = int((answers[both, a] == answers[both, b]).sum())
+            pairs.append({
+                "models": [names[a], names[b]],
+                "shared": shared,
+                "agree": same,
+                "agreement": round(same / shared * 100, 2)
+            })
+    return pairs
+
+
+def load_table(args):
+    if args.store:
+        return result_store.ResultStore(args.store)
+    files = result_store.known_result_files()
+    return result_store.ResultStore.from_rows(result_store.rows_from_files(files))
+
+
+def print_pivot(rows, by):
+    widths = [max([len(name)] + [len(str(r[name])) for r in rows]) for name in by]
+    print("  ".join(name.ljust(w) for name, w in zip(by, widths)) + "  correct  total  accuracy")
+    for r in rows:
+        print("  ".join(str(r[name]).ljust(w) for name, w in zip(by, widths))
+              + f"  {r['correct']:>7}  {r['total']:>5}  {r['accuracy']:>7}%")
+
+
+def print_confusion(matrices):
+    for model, counts in matrices.items():
+        print(f"\n{model} (rows: correct answer, columns: predicted)")
+        print("     " + "".join(f"{c:>6}" for c in LETTERS) + "     -")
+        for letter, row in zip(LETTERS, counts):
+            print(f"  {letter}  " + "".join(f"{v:>6}" for v in row))
+
+
+def print_agreement(pairs):
+    for p in sorted(pairs, key=lambda p: -p["agreement"]):
+        print(f"{p['models'][0]:>18} / {p['models'][1]:<18} {p['agreement']:>6}%  ({p['agree']}/{p['shared']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.analytics",
+                                     description="Accuracy pivots, confusion matrices and model agreement")
+    parser.add_argument("report", nargs="?", choices=["pivot", "confusion", "agreement", "all"], default="pivot")
+    parser.add_argument("--store", help="read a store from python -m harness.store convert instead of the result JSONs")
+    parser.add_argument("--by", nargs="+", choices=DIMENSIONS, default=DIMENSIONS, help="pivot dimensions")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    start = time.perf_counter()
+    table = load_table(args)
+    loaded = time.perf_counter()
+
+    reports = {}
+    if args.report in ("pivot", "all"):
+        reports["pivot"] = pivot(table, args.by)
+    if args.report in ("confusion", "all"):
+        reports["confusion"] = confusion(table)
+    if args.report in ("agreement", "all"):
+        reports["agreement"] = agreement(table)
+    done = time.perf_counter()
+    table.close()
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return 0
+    if "pivot" in reports:
+        print_pivot(reports["pivot"], args.by)
+    if "confusion" in reports:
+        print_confusion(reports["confusion"])
+    if "agreement" in reports:
+        print("\nAgreement between models on the questions both answered")
+        print_agreement(reports["agreement"])
+    print(f"\n{len(table)} rows; loaded in {loaded - start:.3f}s, analysed in {done - loaded:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
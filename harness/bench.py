@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from harness import client, engine, resilience, sections
+from harness.cache import ResponseCache
+from harness.providers import FakeProvider
+
+
+# Repeat a section's real questions until there are n of them, each with a unique id and prompt
+def synthetic_questions(section, n):
+    base = [q for q in section.select(section.load()) if q.get("correct_answer")]
+    questions = []
+    for i in range(n):
+        q = dict(base[i % len(base)])
+        q["question_id"] = i + 1
+        if i >= len(base):
+            q["question"] = f"{q['question']}\n[copy {i // len(base)}]"
+        questions.append(q)
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end throughput benchmark against the fake provider")
+    parser.add_argument("--section", default="ds", help="section whose prompts and parser are exercised")
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--models", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--accuracy", type=float, default=0.6)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--per-model", type=int, default=16)
+    parser.add_argument("--order", choices=["question", "model"], default="question")
+    parser.add_argument("--cache", action="store_true", help="route calls through an in-memory response cache")
+    args = parser.parse_args()
+
+    section = sections.get(args.section)
+    questions = synthetic_questions(section, args.questions)
+    models = [f"fake-model-{i}" for i in range(args.models)]
+    answer_key = {section.build_prompt(q): str(q["correct_answer"]).strip().upper() for q in questions}
+
+    provider = FakeProvider(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            error_rate=args.error_rate, accuracy=args.accuracy, answer_key=answer_key)
+    client.set_provider(provider)
+    client.set_cache(ResponseCache(":memory:") if args.cache else None)
+    # The benchmark measures the harness, not the politeness limits
+    resilience.REQUESTS_PER_MINUTE = float("inf")
+    resilience.BACKOFF_BASE = 0.0
+    resilience.COOLDOWN = 1.0
+
+    start = time.perf_counter()
+    results = engine.run([(section, questions)], models, ["tree_of_thought"], order=args.order,
+                         max_concurrency=args.concurrency,
+                         per_model_concurrency=args.per_model, verbose=False)[section.name]
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "results.json"), "w") as f:
+            json.dump(results, f, indent=2)
+    elapsed = time.perf_counter() - start
+
+    evaluations = len(results["questions"])
+    correct = sum(1 for r in results["questions"] if r["is_correct"])
+    failed = sum(1 for r in results["questions"] if r.get("error"))
+    print(f"Evaluations:  {evaluations} ({len(questions)} questions x {len(models)} models)")
+    print(f"Provider calls: {provider.calls}, failed evaluations: {failed}")
+    print(f"Accuracy:     {round(correct / evaluations * 100, 2) if evaluations else 0}% (target {args.accuracy * 100}%)")
+    print(f"Elapsed:      {elapsed:.2f}s")
+    print(f"Throughput:   {evaluations / elapsed:.0f} evaluations/s")
+
+
+if __name__ == "__main__":
+    main()
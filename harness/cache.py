@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Defaults
+CACHE_PATH = os.environ.get(
+    "GMAT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "responses.sqlite")
+)
+MAX_ENTRIES = 100_000
+MAX_BYTES = 512 * 1024 * 1024
+MAX_AGE_DAYS = 180
+EVICT_EVERY = 500  # puts between eviction sweeps
+
+
+def model_name(model):
+    return str(getattr(model, "name", model))
+
+
+# Content address: model + the exact messages sent + sampling parameters.
+# Providers other than g4f pass a namespace so their responses never mix with real ones.
+def make_key(model, messages, params=None, namespace=None):
+    content = {"model": model_name(model), "messages": messages, "params": params or {}}
+    if namespace:
+        content["namespace"] = namespace
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Saved on each result answered by a single plain call, so the response can be
+# matched to the prompt that produced it
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.puts_since_evict = 0
+        self.lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.evict()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, response, replace=True):
+        now = time.time()
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self.lock:
+            self.conn.execute(
+                f"{verb} INTO responses (key, model, response, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name(model), response, len(response.encode("utf-8")), now, now)
+            )
+            self.puts_since_evict += 1
+            due = self.puts_since_evict >= EVICT_EVERY
+        if due:
+            self.evict()
+
+    def evict(self):
+        with self.lock:
+            self.puts_since_evict = 0
+            cur = self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,))
+            removed = cur.rowcount
+
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if count <= self.max_entries and size <= self.max_bytes:
+                return removed
+
+            # Least recently used first until both limits hold again
+            keep = 0
+            kept_bytes = 0
+            for (row_size,) in self.conn.execute("SELECT size FROM responses ORDER BY accessed DESC").fetchall():
+                if keep + 1 > self.max_entries or kept_bytes + row_size > self.max_bytes:
+                    break
+                keep += 1
+                kept_bytes += row_size
+            cur = self.conn.execute(
+                "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT ?)",
+                (keep,)
+            )
+            return removed + cur.rowcount
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.execute("VACUUM")
+
+    def stats(self):
+        with self.lock:
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": count,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits / lookups) * 100, 2) if lookups else 0
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# Seed the cache from a results file written by the engine, so calls that were
+# already paid for are not made again. A record is imported only when it was
+# answered by one plain call of exactly the prompt build_prompt renders now:
+# searched, voted and batched records, results of an older prompt or an edited
+# question, and files without prompt hashes (the original runners') are skipped.
+def import_results(cache, results_path, questions, build_prompt, skip_styles=(), params=None):
+    with open(results_path, "r") as f:
+        results = json.load(f)
+
+    by_id = {}
+    for q in questions:
+        by_id.setdefault(q["question_id"], q)
+
+    imported = 0
+    for r in results.get("questions", []):
+        q = by_id.get(r.get("question_id"))
+        if q is None or not r.get("explanation") or not r.get("prompt_hash") or r.get("prompt_style") in skip_styles:
+            continue
+        prompt = build_prompt(q)
+        if r["prompt_hash"] != prompt_hash(prompt):
+            continue
+        messages = [{"role": "user", "content": prompt}]
+        cache.put(make_key(r["model"], messages, params), r["model"], r["explanation"], replace=False)
+        imported += 1
+    return imported
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "stats"
+    cache = ResponseCache()
+
+    if command == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    elif command == "prune":
+        print(f"Evicted {cache.evict()} entries")
+    elif command == "clear":
+        cache.clear()
+        print(f"Cleared {cache.path}")
+    else:
+        print("usage: python -m harness.cache [stats|prune|clear]")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
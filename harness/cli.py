@@ -0,0 +1,161 @@
+import argparse
+import os
+import sys
+
+from harness import config, engine, metrics, sampling, sections, trace
+from harness import questions as question_store
+from harness.journal import Journal
+
+
+def add_run_arguments(parser):
+    parser.add_argument("--sections", nargs="+", default=sections.DEFAULT_SECTIONS,
+                        help=f"sections to evaluate ({', '.join(sections.SECTIONS)})")
+    parser.add_argument("--models", nargs="+", default=config.MODELS)
+    parser.add_argument("--prompt-styles", nargs="+", default=config.PROMPT_STYLES)
+    parser.add_argument("--resume", action="store_true", help="skip evaluations already recorded in the journal")
+    parser.add_argument("--changed", action="store_true",
+                        help="resume, but ask again the questions dataset reloads added or changed since this journal last did")
+    parser.add_argument("--concurrency", type=int, default=engine.MAX_CONCURRENCY,
+                        help="calls in flight across all models")
+    parser.add_argument("--per-model", type=int, default=engine.PER_MODEL_CONCURRENCY,
+                        help="calls in flight per model")
+    parser.add_argument("--order", choices=["question", "model"], default="question",
+                        help="question: render each prompt once and send it to all models together")
+    parser.add_argument("--stream", help="append one JSONL row per finished question (question order only)")
+    parser.add_argument("--target-width", type=float,
+                        help="adaptive: stop a model once its 95%% interval is this narrow (e.g. 0.15)")
+    parser.add_argument("--budget", type=int, help="quick smoke run: only this many questions per section")
+    parser.add_argument("--seed", type=int, default=sampling.SEED, help="seed of the stratified question order")
+    parser.add_argument("--metrics", help="write per-model call latency, size and retry metrics to "
+                                          "METRICS.json and METRICS.prom (Prometheus text format)")
+    parser.add_argument("--trace", help="write a Chrome trace of every pipeline stage to TRACE (chrome://tracing, Perfetto)")
+    parser.add_argument("--profile", choices=trace.PROFILES,
+                        help="with --trace: cprofile the main thread (.pstats next to the trace) or sample every thread's stack")
+    parser.add_argument("--shard", type=shard_spec,
+                        help="K/N: evaluate only shard K (0-based) of N and save partial results for harness.shard merge")
+
+
+# Combinations argparse cannot express on its own
+def check_run_arguments(parser, args):
+    if args.stream and args.order == "model":
+        parser.error("--stream writes rows as questions finish, which needs --order question")
+    problem = sections.unsupported_styles(args.sections, args.prompt_styles)
+    if problem:
+        parser.error(problem)
+
+
+def shard_spec(value):
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}, got {value!r}")
+    return index, count
+
+
+def row_writer(path, resume):
+    rows = Journal(path, resume=resume)
+
+    def on_row(section, q, prompt_style, by_model):
+        rows.append({
+            "section": section.name,
+            "question_id": q["question_id"],
+            "prompt_style": prompt_style,
+            "correct_answer": q.get("correct_answer"),
+            "models": {
+                model: {"predicted": r["predicted"], "is_correct": r["is_correct"], "error": r.get("error")}
+                for model, r in by_model.items() if r is not None
+            }
+        })
+
+    return rows, on_row
+
+
+def run_command(args):
+    # Shards running side by side each keep their own files
+    suffix = f".shard-{args.shard[0]}-of-{args.shard[1]}" if args.shard else ""
+    if args.profile and not args.trace:
+        print("❌ --profile needs --trace, which names its output")
+        return 2
+    if args.trace:
+        base, extension = os.path.splitext(args.trace)
+        trace.start(base + suffix + extension, args.profile)
+    try:
+        with trace.span("run", sections=args.sections, models=args.models):
+            return run_sections(args)
+    finally:
+        if args.trace:
+            print(f"🧭 Trace written to {', '.join(trace.stop())}")
+        if args.metrics:
+            print(f"📈 Call metrics written to {', '.join(metrics.export(args.metrics + suffix))}")
+
+
+def run_sections(args):
+    selected = [sections.get(name) for name in args.sections]
+    sampled = args.target_width is not None or args.budget is not None
+    if args.shard and sampled:
+        print("❌ --shard cannot be combined with --target-width or --budget: sampling needs every shard's answers")
+        return 2
+
+    workload = []
+    journals = {}
+    for section in selected:
+        questions = section.load()
+        section.warm_cache(questions)
+        workload.append((section, questions))
+        journal_path = section.shard_path(*args.shard, ".jsonl") if args.shard else section.journal_path()
+        # Each journal takes the dataset changes made since it last did, so changes
+        # from reloads in between (analytics, grading, ...) are not lost
+        store = question_store.get_store()
+        consumer = os.path.abspath(journal_path)
+        invalidate = None
+        if args.changed:
+            invalidate, mark = store.pending_changes(section.dataset, consumer)
+            print(f"🔄 {section.title}: {len(invalidate)} added or changed questions are asked again")
+        journals[section.name] = Journal(journal_path, resume=args.resume or args.changed, invalidate=invalidate)
+        if args.changed:
+            store.take_changes(section.dataset, consumer, mark)
+        elif not args.resume:
+            # A fresh journal asks every question as it is now
+            store.take_changes(section.dataset, consumer)
+
+    if sampled:
+        all_results = sampling.run(workload, args.models, args.prompt_styles, journals=journals,
+                                   target_width=args.target_width, budget=args.budget, seed=args.seed,
+                                   max_concurrency=args.concurrency, per_model_concurrency=args.per_model)
+        for section in selected:
+            section.save(all_results[section.name], section.sample_path())
+        return 0
+
+    rows, on_row = row_writer(args.stream, args.resume or args.changed) if args.stream else (None, None)
+    try:
+        all_results = engine.run(workload, args.models, args.prompt_styles, journals=journals, order=args.order,
+                                 on_row=on_row, max_concurrency=args.concurrency,
+                                 per_model_concurrency=args.per_model, shard=args.shard)
+    finally:
+        if rows is not None:
+            rows.close()
+    for section in selected:
+        if args.shard:
+            results = all_results[section.name]
+            results["shard"] = {"index": args.shard[0], "count": args.shard[1],
+                                "models": args.models, "prompt_styles": args.prompt_styles}
+            section.save(results, section.shard_path(*args.shard))
+        else:
+            section.save(all_results[section.name])
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness", description="GMAT evaluation harness")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="evaluate models on one or more sections")
+    add_run_arguments(run_parser)
+    run_parser.set_defaults(func=run_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command == "run":
+        check_run_arguments(run_parser, args)
+    return args.func(args)
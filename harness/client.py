@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+from harness import cache as response_cache
+from harness import metrics
+from harness import providers
+from harness import resilience, trace
+from harness.resilience import CallFailed
+
+# Set GMAT_CACHE=off to always go to the provider
+CACHE_ENABLED = os.environ.get("GMAT_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+_cache = None
+_cache_set = False
+_provider = None
+_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache, _cache_set
+    with _lock:
+        if not _cache_set:
+            _cache = response_cache.ResponseCache() if CACHE_ENABLED else None
+            _cache_set = True
+        return _cache
+
+
+# Pass None to disable caching, or e.g. ResponseCache(":memory:") for a throwaway one
+def set_cache(cache):
+    global _cache, _cache_set
+    with _lock:
+        _cache = cache
+        _cache_set = True
+
+
+def get_provider():
+    global _provider
+    with _lock:
+        if _provider is None:
+            _provider = providers.from_environment()
+        return _provider
+
+
+def set_provider(provider):
+    global _provider
+    with _lock:
+        _provider = provider
+
+
+# Every provider call is timed and sized into the metrics of the running evaluation
+def _create(model, messages, **params):
+    provider = get_provider()
+    name = response_cache.model_name(model)
+    stats = {}
+    try:
+        with trace.span("provider call", "provider", model=name, provider=provider.name):
+            response = resilience.call(name, lambda: provider.create(model, messages, **params), stats=stats)
+    except CallFailed as e:
+        metrics.record_call(name, provider.name, messages, None, stats, error=e)
+        raise
+    metrics.record_call(name, provider.name, messages, response, stats)
+    return response
+
+
+# sample tells repeated samples of one prompt apart in the cache; it is not sent
+# to the provider. Sample 0 shares the entry of a plain call.
+def chat(prompt, model, sample=None, **params):
+    return converse([{"role": "user", "content": prompt}], model, sample=sample, **params)
+
+
+# Same as chat, for a whole conversation
+def converse(messages, model, sample=None, **params):
+    cache = get_cache()
+    if cache is None:
+        return _create(model, messages, **params)
+
+    provider = get_provider()
+    namespace = provider.namespace
+    key_params = dict(params, sample=sample) if sample else params
+    key = response_cache.make_key(model, messages, key_params, namespace=namespace)
+    start = time.perf_counter()
+    response = cache.get(key)
+    if response is None:
+        response = _create(model, messages, **params)
+        cache.put(key, model, response)
+    else:
+        metrics.record_call(response_cache.model_name(model), provider.name, messages, response, cached=True,
+                            elapsed=time.perf_counter() - start)
+    return response
+
+
+def warm_cache(results_path, questions, build_prompt, skip_styles=()):
+    cache = get_cache()
+    # Stored results hold real answers, which a fake provider's cache entries must never mix with
+    if cache is None or get_provider().namespace is not None or not os.path.exists(results_path):
+        return 0
+    return response_cache.import_results(cache, results_path, questions, build_prompt, skip_styles)
+
+
+def summary():
+    cache = get_cache()
+    if cache is None:
+        line = "Response cache disabled"
+    else:
+        s = cache.stats()
+        line = f"Response cache: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']}% hit rate), {s['entries']} entries"
+    provider = get_provider()
+    if hasattr(provider, "stats"):
+        s = provider.stats()
+        line += f"\nConnections: {s['opened']} opened for {s['requests']} requests ({s['reused']} reused)"
+    return line
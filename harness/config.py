@@ -0,0 +1,16 @@
+import os
+
+from dotenv import load_dotenv
+
+# Loaded on import, so settings in .env (e.g. GMAT_PROVIDER) reach every module's defaults
+load_dotenv()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Constants
+MODELS = ["gpt-4", "gpt-4o", "gpt-4o-mini", "llama-3.1-8b", "llama-3.1-70b", "llama-3.1-405b", "gemini-1.5-flash"]
+PROMPT_STYLES = ["tree_of_thought"]
+
+
+def path(*parts):
+    return os.path.join(ROOT, *parts)
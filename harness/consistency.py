@@ -0,0 +1,80 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from harness import client, metrics
+from harness.cache import model_name
+from harness.resilience import CallFailed
+
+# Defaults
+STYLE = "self_consistency"
+SAMPLES = int(os.environ.get("GMAT_SAMPLES", "5"))
+
+# Samples run here, outside the engine's slots; the per-model rate limiter still applies
+_executor = ThreadPoolExecutor(max_workers=64)
+
+
+# The vote is decided once one answer has a majority of all samples, or leads
+# by more than the samples still to come
+def decided(votes, uncast, needed):
+    ranked = [count for _, count in votes.most_common(2)]
+    top = ranked[0] if ranked else 0
+    second = ranked[1] if len(ranked) > 1 else 0
+    return top >= needed or top > second + uncast or uncast == 0
+
+
+def ask(prompt, model, parse, k):
+    start = time.perf_counter()
+    try:
+        response = client.chat(prompt, model=model, sample=k)
+    except CallFailed as e:
+        return {"sample": k, "predicted": "", "latency": round(time.perf_counter() - start, 3), "error": str(e)}, None
+    return {"sample": k, "predicted": parse(response), "latency": round(time.perf_counter() - start, 3)}, response
+
+
+# Ask the same prompt up to `samples` times. Only as many samples as could still
+# settle the vote are in flight, so a unanimous start costs samples // 2 + 1 calls.
+# Returns (winning answer, one response that gave it, vote counts, per-sample info).
+def vote(prompt, model, parse, samples=SAMPLES):
+    needed = samples // 2 + 1
+    votes = Counter()
+    first_vote = {}
+    responses = {}
+    info = []
+    pending = set()
+    launched = 0
+    last_error = None
+
+    while not decided(votes, len(pending) + samples - launched, needed):
+        top = max(votes.values(), default=0)
+        wanted = min(samples - launched, max(0, needed - top - len(pending)))
+        for _ in range(wanted):
+            pending.add(metrics.submit(_executor, ask, prompt, model, parse, launched))
+            launched += 1
+        if not pending:
+            break
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            sample, response = future.result()
+            info.append(sample)
+            if "error" in sample:
+                last_error = sample["error"]
+            elif sample["predicted"]:
+                votes[sample["predicted"]] += 1
+                first_vote.setdefault(sample["predicted"], sample["sample"])
+                responses.setdefault(sample["predicted"], response)
+            elif None not in responses:
+                # Unparsed answers don't vote, but keep one as the explanation in case nothing parses
+                responses[None] = response
+    for future in pending:
+        future.cancel()
+
+    if not votes and len(info) == sum(1 for s in info if "error" in s):
+        raise CallFailed(model_name(model), len(info), last_error)
+    info.sort(key=lambda s: s["sample"])
+    if not votes:
+        return "", responses.get(None, ""), {}, info
+    # Ties go to the answer that was given first
+    winner = min(votes, key=lambda answer: (-votes[answer], first_vote[answer]))
+    return winner, responses[winner], dict(votes), info
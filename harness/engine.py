@@ -0,0 +1,321 @@
+import asyncio
+import functools
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness import client, metrics, repair, trace
+from harness.journal import load, record_key, task_key
+from harness.resilience import CallFailed
+
+# Defaults
+MAX_CONCURRENCY = 16
+PER_MODEL_CONCURRENCY = 4
+QUESTION_WINDOW = 4  # question-major: questions in flight per global slot
+READY_POLL = 0.05  # seconds between checks of an evaluation held back by its section
+
+# Stands in for the record of a task another shard owns
+SKIPPED = object()
+
+
+# Same order the sequential runners used: model -> prompt style -> question
+def plan(section, questions, models, prompt_styles):
+    return [(section, model, ps, q) for model in models for ps in prompt_styles for q in questions]
+
+
+# Stable shard of a (model, prompt style, question) work item: the same on every
+# host and in every run, whatever the plan order
+def shard_of(model, prompt_style, question_id, count):
+    key = "\x1f".join((str(model), str(prompt_style), str(question_id)))
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % count
+
+
+# Record for a call that exhausted its retries (or an evaluation that raised); it still counts towards the total
+def failure_record(section, q, model, ps, error):
+    record = {
+        "question_id": q["question_id"],
+        "model": model,
+    }
+    if section.subtypes:
+        record["subtype"] = section.subtype(q)
+    record.update({
+        "prompt_style": ps,
+        "predicted": "",
+        "correct_answer": q.get("correct_answer"),
+        "is_correct": False,
+        "explanation": "",
+        "error": str(error)
+    })
+    return record
+
+
+# queued: when the evaluation started waiting for its engine slots, so their wait counts as queue wait
+def evaluate_one(section, model, ps, q, prompt=None, on_record=None, verbose=True, queued=None):
+    if verbose:
+        print(f"Evaluating Q{q['question_id']} ({section.name}) with {model} - {ps}...")
+    with metrics.evaluation(section.name, queued) as calls, trace.span("evaluate", "evaluation", section=section.name,
+                                                                 question=str(q["question_id"]), model=str(model),
+                                                                 prompt_style=ps):
+        try:
+            record = section.evaluate(q, model, ps, prompt=prompt)
+        except CallFailed as e:
+            print(f"❌ Q{q['question_id']} ({section.name}) with {model} - {ps}: {e}")
+            record = failure_record(section, q, model, ps, e)
+        except Exception as e:
+            # A bug in the section's evaluate, parse or grade fails this one question, not the sweep
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ Q{q['question_id']} ({section.name}) with {model} - {ps}: {error}")
+            record = failure_record(section, q, model, ps, error)
+    metrics.annotate(record, calls)
+    if record is not None and on_record is not None:
+        on_record(section, record)
+    return record
+
+
+async def gather_or_cancel(coroutines):
+    pending = [asyncio.ensure_future(c) for c in coroutines]
+    try:
+        await asyncio.gather(*pending)
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+
+
+# Holds an evaluation back, without taking a slot, until its section is ready for it
+async def wait_ready(section, model, ps, q):
+    ready = section.ready(q, model, ps)
+    while ready is not None and not ready.is_set():
+        await asyncio.sleep(READY_POLL)
+
+
+class Slots:
+    def __init__(self, models, max_concurrency, per_model_concurrency):
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.global_slots = asyncio.Semaphore(max_concurrency)
+        self.model_slots = {model: asyncio.Semaphore(per_model_concurrency) for model in models}
+
+    # fn gets queued=<when the wait for the slots began>
+    async def call(self, model, fn, *args):
+        queued = time.perf_counter()
+        # Take the per-model slot first so a busy model never holds a global slot while waiting
+        async with self.model_slots[model]:
+            async with self.global_slots:
+                return await asyncio.get_running_loop().run_in_executor(self.executor,
+                                                                        functools.partial(fn, *args, queued=queued))
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Model-major: one task per (model, prompt style, question), each renders its own prompt
+async def evaluate_all(tasks, max_concurrency=MAX_CONCURRENCY, per_model_concurrency=PER_MODEL_CONCURRENCY,
+                       on_record=None, verbose=True):
+    slots = Slots({t[1] for t in tasks}, max_concurrency, per_model_concurrency)
+    records = [None] * len(tasks)
+
+    async def run_one(i, section, model, ps, q):
+        await wait_ready(section, model, ps, q)
+        records[i] = await slots.call(model, evaluate_one, section, model, ps, q, None, on_record, verbose)
+
+    try:
+        await gather_or_cancel(run_one(i, *t) for i, t in enumerate(tasks))
+    finally:
+        slots.close()
+
+    # Records keep their plan position, so completion order never leaks into the output
+    return records
+
+
+# Question-major: each group is (section, question, prompt style, [(model, index, known record)]).
+# The prompt is rendered once per group and fanned out to every model that still
+# needs it; on_row gets the complete row as soon as the group's last model answers.
+async def evaluate_by_question(groups, size, max_concurrency=MAX_CONCURRENCY,
+                               per_model_concurrency=PER_MODEL_CONCURRENCY, on_record=None, on_row=None,
+                               verbose=True):
+    models = {model for _, _, _, members in groups for model, _, _ in members}
+    slots = Slots(models, max_concurrency, per_model_concurrency)
+    # Bounds how many rendered prompts are alive at once
+    window = asyncio.Semaphore(max_concurrency * QUESTION_WINDOW)
+    records = [None] * size
+
+    async def run_model(section, q, ps, prompt, model, i):
+        await wait_ready(section, model, ps, q)
+        records[i] = await slots.call(model, evaluate_one, section, model, ps, q, prompt, on_record, verbose)
+
+    async def run_group(section, q, ps, members):
+        async with window:
+            todo = [(model, i) for model, i, known in members if known is None]
+            if todo:
+                prompt = await asyncio.get_running_loop().run_in_executor(slots.executor, section.render_prompt, q)
+                await gather_or_cancel(run_model(section, q, ps, prompt, model, i) for model, i in todo)
+        if on_row is not None:
+            row = {model: known or records[i] for model, i, known in members if known is not SKIPPED}
+            if row:
+                on_row(section, q, ps, row)
+
+    try:
+        await gather_or_cancel(run_group(*g) for g in groups)
+    finally:
+        slots.close()
+    return records
+
+
+def aggregate(records, models, prompt_styles, question_type=None, subtypes=None):
+    counts = {}
+    for r in records:
+        key = (r["model"], r["prompt_style"])
+        bucket = counts.setdefault(key, {"correct": 0, "total": 0, "failed": 0, "subtypes": {}})
+        bucket["total"] += 1
+        if r.get("error"):
+            bucket["failed"] += 1
+        if r["is_correct"]:
+            bucket["correct"] += 1
+        if subtypes:
+            st = bucket["subtypes"].setdefault(r.get("subtype", "").lower(), {"correct": 0, "total": 0})
+            st["total"] += 1
+            if r["is_correct"]:
+                st["correct"] += 1
+
+    accuracy = {}
+    overall_accuracy = {}
+    per_model = accuracy.setdefault(question_type, {}) if question_type else accuracy
+
+    for model in models:
+        per_model[model] = {}
+        overall_accuracy[model] = {}
+        for ps in prompt_styles:
+            bucket = counts.get((model, ps), {"correct": 0, "total": 0, "failed": 0, "subtypes": {}})
+            correct = bucket["correct"]
+            total = bucket["total"]
+
+            if subtypes:
+                per_model[model][ps] = {
+                    st: dict(bucket["subtypes"].get(st.lower(), {"correct": 0, "total": 0}))
+                    for st in subtypes
+                }
+            else:
+                per_model[model][ps] = {"correct": correct, "total": total}
+
+            overall_accuracy[model][ps] = {
+                "correct": correct,
+                "total": total,
+                "failed": bucket["failed"],
+                "accuracy": round((correct / total) * 100, 2) if total else 0
+            }
+
+    return accuracy, overall_accuracy
+
+
+# Put journal records back into plan order. Duplicate question_ids are matched
+# occurrence by occurrence, so a repeated id is only skipped as often as it was recorded.
+@trace.traced("merge journal")
+def from_journal(tasks, journal_records):
+    stored = {}
+    for r in journal_records:
+        stored.setdefault(record_key(r), []).append(r)
+
+    records = [None] * len(tasks)
+    for i, (_, model, ps, q) in enumerate(tasks):
+        matches = stored.get(task_key(model, ps, q["question_id"]))
+        if matches:
+            # A successful retry supersedes an earlier failed attempt
+            pick = next((j for j, r in enumerate(matches) if not r.get("error")), 0)
+            records[i] = matches.pop(pick)
+    return records
+
+
+@trace.traced("aggregate")
+def build_results(section, questions, records, models, prompt_styles):
+    # evaluate() may return None for a question it chose to skip
+    records = [r for r in records if r is not None]
+    accuracy, overall_accuracy = aggregate(records, models, prompt_styles, section.question_type, section.subtypes)
+    return {
+        "total_questions": len(questions),
+        "questions": records,
+        "accuracy": accuracy,
+        "overall_accuracy": overall_accuracy
+    }
+
+
+# workload is a list of (section, loaded questions). Every section's work goes
+# into one task pool, so the network stays busy across section boundaries.
+# order="question" renders each prompt once and sends it to all models together,
+# calling on_row(section, q, prompt_style, {model: record}) per finished question.
+# Returns {section name: results}; record order is model-major either way.
+# shard=(index, count) evaluates only the work items shard_of assigns to index.
+def run(workload, models, prompt_styles, journals=None, order="model", on_row=None,
+        max_concurrency=MAX_CONCURRENCY, per_model_concurrency=PER_MODEL_CONCURRENCY, verbose=True, shard=None):
+    journals = journals or {}
+    plans = []
+    all_tasks = []
+    all_known = []
+    for section, questions in workload:
+        section.reset()
+        selected = section.select(questions)
+        tasks = plan(section, selected, models, prompt_styles)
+        journal = journals.get(section.name)
+        if journal is None:
+            known = [None] * len(tasks)
+        else:
+            # Failed calls are retried on resume
+            known = from_journal(tasks, [r for r in journal.records if not r.get("error")])
+        if shard is not None:
+            index, count = shard
+            known = [SKIPPED if shard_of(model, ps, q["question_id"], count) != index else r
+                     for (_, model, ps, q), r in zip(tasks, known)]
+            owned = sum(1 for r in known if r is not SKIPPED)
+            print(f"Shard {index}/{count}: {owned} of {len(tasks)} {section.name} evaluations")
+        if journal is not None:
+            skipped = sum(1 for r in known if r is not None and r is not SKIPPED)
+            if skipped:
+                print(f"Resuming: {skipped} of {len(tasks)} evaluations already in {journal.path}")
+        plans.append((section, questions, selected, tasks, len(all_tasks)))
+        all_tasks.extend(tasks)
+        all_known.extend(known)
+
+    def on_record(section, record):
+        journal = journals.get(section.name)
+        if journal is not None:
+            journal.append(record)
+
+    try:
+        if order == "question":
+            groups = []
+            for section, _, selected, _, offset in plans:
+                n, p = len(selected), len(prompt_styles)
+                for qi, q in enumerate(selected):
+                    for pi, ps in enumerate(prompt_styles):
+                        # Position of (model, ps, q) in the model-major plan
+                        indexes = [(model, offset + (mi * p + pi) * n + qi) for mi, model in enumerate(models)]
+                        members = [(model, i, all_known[i]) for model, i in indexes]
+                        groups.append((section, q, ps, members))
+            records = asyncio.run(evaluate_by_question(groups, len(all_tasks), max_concurrency, per_model_concurrency,
+                                                       on_record=on_record, on_row=on_row, verbose=verbose))
+        elif order == "model":
+            todo = [i for i, known in enumerate(all_known) if known is None]
+            done = asyncio.run(evaluate_all([all_tasks[i] for i in todo], max_concurrency, per_model_concurrency,
+                                            on_record=on_record, verbose=verbose))
+            records = [None] * len(all_tasks)
+            for i, record in zip(todo, done):
+                records[i] = record
+        else:
+            raise ValueError(f"Unknown order {order!r}; use 'model' or 'question'")
+    finally:
+        for journal in journals.values():
+            journal.close()
+    if verbose:
+        print(client.summary())
+        print(repair.summary())
+        print(metrics.summary())
+
+    all_results = {}
+    for section, questions, _, tasks, offset in plans:
+        journal = journals.get(section.name)
+        if journal is None:
+            section_records = records[offset:offset + len(tasks)]
+        else:
+            # The journal is the source of truth for the aggregate, not what happens to be in memory
+            section_records = from_journal(tasks, load(journal.path))
+        all_results[section.name] = build_results(section, questions, section_records, models, prompt_styles)
+    return all_results
@@ -0,0 +1,272 @@
+import argparse
+import ast
+import json
+import re
+import sys
+import time
+
+from harness import engine, sections
+from harness import store as result_store
+from harness.normalize import normalize_text
+
+LETTERS = "ABCDE"
+
+ANSWER_MARKER = re.compile(r"^[\s#*_>\-]*(?:final\s+)?answer\s*[*_]*\s*:[*_]*\s*(.*)$", re.IGNORECASE)
+ANSWER_IS = re.compile(r"answer\s+is\W*\(?([A-E])\b")
+BOXED = re.compile(r"\\boxed\{\(?([A-E])\)?\}")
+LETTER = re.compile(r"^\W*\(?([A-E])\b")
+PAIR = re.compile(r"""\s*["']?([^"':,{}]+?)["']?\s*:\s*("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^,}]+)""")
+NUMBER = re.compile(r"^-?\d+(?:\.\d+)?$")
+STATEMENT_TRUTH = re.compile(r"\b(\d)\b|\b(not\s+)?(true|false)\b")
+TRUE_WORDS = {"true", "yes", "t", "y"}
+FALSE_WORDS = {"false", "no", "f", "n"}
+
+
+# The text after each "Answer:" marker, in order. Markdown around the marker is
+# allowed ("### Answer:", "**Final Answer:**"); a marker with nothing after it takes the next line.
+def answer_texts(response):
+    lines = (response or "").splitlines()
+    found = []
+    for i, line in enumerate(lines):
+        match = ANSWER_MARKER.match(line)
+        if not match:
+            continue
+        text = match.group(1).strip()
+        if not text:
+            text = next((l.strip() for l in lines[i + 1:] if l.strip()), "")
+        if text:
+            found.append(text)
+    return found
+
+
+# The last answer given wins, so a model that corrects itself is graded on the correction
+def answer_text(response):
+    texts = answer_texts(response)
+    return texts[-1] if texts else ""
+
+
+# Answers are compared in the question store's notation, so "x^2" matches "x²"
+def normalize(value):
+    text = normalize_text(str(value)).strip().strip("*_`").strip().strip("\"'").strip()
+    text = " ".join(text.split()).rstrip(".").lower()
+    number = text.replace("$", "").replace(",", "").replace("%", "").strip()
+    if NUMBER.match(number):
+        return str(float(number))
+    return text
+
+
+def key_name(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def extract_letter(response):
+    for text in reversed(answer_texts(response)):
+        match = LETTER.match(text.replace("*", "")) or BOXED.search(text) or ANSWER_IS.search(text)
+        if match:
+            return match.group(1)
+    match = BOXED.search(response or "") or ANSWER_IS.search(response or "")
+    return match.group(1) if match else ""
+
+
+def parse_mapping(text):
+    text = text.strip()
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value
+    except ValueError:
+        pass
+    body = text.strip().strip("{}")
+    return {key.strip(): value.strip() for key, value in PAIR.findall(body)} if ":" in body else None
+
+
+def parse_list(text):
+    text = text.strip()
+    for load in (json.loads, ast.literal_eval):
+        try:
+            value = load(text)
+            if isinstance(value, (list, tuple)):
+                return list(value)
+        except (ValueError, SyntaxError):
+            pass
+    if text.startswith("[") and text.endswith("]"):
+        return [part.strip() for part in text[1:-1].split(",") if part.strip()]
+    return None
+
+
+# Multi-part answers nest one list per sub-question; they are compared leaf by leaf
+def flatten(values):
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            yield from flatten(value)
+        else:
+            yield value
+
+
+def dict_matches(predicted, expected):
+    if not predicted or len(predicted) < len(expected):
+        return False
+    by_name = {key_name(k): v for k, v in predicted.items()}
+    if all(key_name(k) in by_name for k in expected):
+        pairs = [(by_name[key_name(k)], v) for k, v in expected.items()]
+    elif len(predicted) == len(expected):
+        # Keys that don't line up ("field_name_1") are matched by position
+        pairs = list(zip(predicted.values(), expected.values()))
+    else:
+        return False
+    return all(normalize(p) == normalize(e) for p, e in pairs)
+
+
+# True/False per statement, from a list or from text like "Statements 1 and 2 are true,
+# 3 is false" / "1: True, 2: False" / "2 only". Each true/false word applies to the
+# statement numbers since the previous one; a statement the text never settles is None.
+def truth_values(text, count):
+    values = parse_list(text)
+    if values is not None:
+        return [normalize(v) in TRUE_WORDS for v in values]
+    lowered = text.lower()
+    if "none" in lowered:
+        return [False] * count
+    if "all" in lowered.split():
+        return [True] * count
+    found = [None] * count
+    pending = []
+    worded = False
+    for number, negation, word in STATEMENT_TRUTH.findall(lowered):
+        if number:
+            if 1 <= int(number) <= count:
+                pending.append(int(number))
+            continue
+        worded = True
+        value = (word == "true") != bool(negation)
+        for n in pending:
+            found[n - 1] = value
+        pending = []
+    if not worded:
+        # A bare list of statements ("1 and 3", "2 only") names the true ones
+        if not pending:
+            return None
+        return [i + 1 in pending for i in range(count)]
+    return found if any(value is not None for value in found) else None
+
+
+# Expected answer of a question. Graphs-and-tables questions keep theirs under
+# "answers", sometimes as the string form of a list.
+def expected_answer(q):
+    expected = q.get("correct_answer")
+    if expected is None and q.get("answers") is not None:
+        expected = q["answers"]
+        if isinstance(expected, str):
+            expected = parse_list(expected)
+    return expected
+
+
+def matches(answer, expected):
+    if expected is None or not answer:
+        return False
+    if isinstance(expected, dict):
+        return dict_matches(parse_mapping(answer), expected)
+    if isinstance(expected, list):
+        if expected and all(normalize(e) in TRUE_WORDS | FALSE_WORDS for e in expected):
+            values = truth_values(answer, len(expected))
+            return values == [normalize(e) in TRUE_WORDS for e in expected]
+        values = parse_list(answer)
+        return values is not None and [normalize(v) for v in flatten(values)] == [normalize(e) for e in flatten(expected)]
+    if str(expected).strip().upper() in LETTERS and len(str(expected).strip()) == 1:
+        letter = LETTER.match(answer.replace("*", ""))
+        return bool(letter) and letter.group(1) == str(expected).strip().upper()
+    return normalize(answer) == normalize(expected)
+
+
+# Re-read a stored response: (predicted, is_correct)
+def grade(response, expected):
+    if isinstance(expected, str) and len(expected.strip()) == 1 and expected.strip().upper() in LETTERS:
+        predicted = extract_letter(response)
+    else:
+        predicted = answer_text(response)
+    return predicted, matches(predicted, expected)
+
+
+# Recompute the accuracy blocks after records changed, in the layout the file already uses
+def refresh_accuracy(results, section_name):
+    section = sections.get(section_name) if section_name else None
+    models = list(results.get("overall_accuracy") or dict.fromkeys(r["model"] for r in results["questions"]))
+    prompt_styles = list(dict.fromkeys(r["prompt_style"] for r in results["questions"]))
+    question_type = section.question_type if section else None
+    subtypes = section.subtypes if section else None
+    if question_type is None and subtypes is None and results.get("accuracy"):
+        # Unknown file: keep whatever accuracy layout it already had
+        first = next(iter(results["accuracy"]))
+        question_type = first if first not in models else None
+    results["accuracy"], results["overall_accuracy"] = engine.aggregate(results["questions"], models, prompt_styles,
+                                                                        question_type, subtypes)
+
+
+def regrade_results(results, section_name):
+    match = result_store.question_matcher(section_name)
+    changed = 0
+    ungradable = 0
+    for r in results["questions"]:
+        q = match(r)
+
+        expected = r.get("correct_answer")
+        if expected is None:
+            expected = expected_answer(q)
+        if expected is None:
+            ungradable += 1
+        if r.get("error"):
+            continue
+        if r.get("votes") is not None or r.get("batched"):
+            # The explanation is one sample of a vote, or answers a whole passage: keep the stored answer
+            predicted = r.get("predicted", "")
+            is_correct = matches(predicted, expected)
+        else:
+            predicted, is_correct = grade(r.get("explanation", ""), expected)
+            if not predicted and (r.get("repair") or {}).get("response"):
+                # The explanation has no answer; the repair follow-up stated it
+                predicted, is_correct = grade(r["repair"]["response"], expected)
+        if is_correct != r.get("is_correct") or predicted != r.get("predicted"):
+            changed += 1
+        r["predicted"] = predicted
+        r["is_correct"] = is_correct
+
+    refresh_accuracy(results, section_name)
+    return changed, ungradable
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.grading",
+                                     description="Re-grade stored results from their explanations, without new calls")
+    parser.add_argument("files", nargs="*", help="result files (default: every section's results)")
+    parser.add_argument("--section", help="section the given files belong to")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.files:
+        files = [(args.section or result_store.section_for_file(path), path) for path in args.files]
+    else:
+        files = result_store.known_result_files()
+
+    start = time.perf_counter()
+    for section_name, path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        before = {m: {ps: v["accuracy"] for ps, v in by_ps.items()}
+                  for m, by_ps in results.get("overall_accuracy", {}).items()}
+        changed, ungradable = regrade_results(results, section_name)
+
+        print(f"\n{path}: {changed} of {len(results['questions'])} records changed")
+        if ungradable:
+            print(f"⚠️  {ungradable} records have no known correct answer and stay incorrect")
+        for model, by_ps in results["overall_accuracy"].items():
+            for ps, v in by_ps.items():
+                print(f"  {model} - {ps}: {before.get(model, {}).get(ps, '?')}% -> {v['accuracy']}%")
+        if not args.dry_run:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+    print(f"\n{'Checked' if args.dry_run else 'Re-graded'} {len(files)} files in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
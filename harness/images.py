@@ -0,0 +1,266 @@
+import argparse
+import ast
+import base64
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: keep to one process per cache directory
+    fcntl = None
+
+from harness import config, questions
+
+# Defaults
+CACHE_DIR = os.environ.get("GMAT_IMAGE_CACHE", config.path(".cache", "images"))
+MAX_SIDE = int(os.environ.get("GMAT_IMAGE_MAX_SIDE", "1568"))  # longest side after downsizing, in pixels
+FORMAT = os.environ.get("GMAT_IMAGE_FORMAT", "PNG").upper()  # PNG keeps screenshot text crisp; JPEG is smaller
+JPEG_QUALITY = 85
+WORKERS = 8
+
+IMAGE_DATASETS = [
+    config.path("DataInsights", "DataSuffciency", "Imagedata", "DataSufficiencyImg.json"),
+    config.path("DataInsights", "IntergratedReasoning", "Imagedata", "IntergratedReasoningImg.json"),
+    config.path("DataInsights", "IntergratedReasoning", "Imagedata", "IR_Multi_Source_ReasoningIMG.json"),
+]
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+# Image files a question refers to, in the order they should be shown: passages
+# (paragraph_id, stored as the string form of a list) before the question itself
+def image_paths(q):
+    paths = []
+    for field in ("paragraph_id", "question"):
+        value = q.get(field)
+        if isinstance(value, str) and value.strip().startswith("["):
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                pass
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, str) and item.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(item if os.path.isabs(item) else config.path(item))
+    return paths
+
+
+# Decode, downsize so the longest side is at most max_side, re-encode. An image
+# that needed no resizing and is already in the target format keeps its original
+# bytes when re-encoding would not make it smaller.
+def encode(data, max_side=MAX_SIDE, fmt=FORMAT):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        original_format = image.format
+        original_size = image.size
+        if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode == "P":
+            image = image.convert("RGBA")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        out = io.BytesIO()
+        options = {"quality": JPEG_QUALITY, "optimize": True} if fmt == "JPEG" else {}
+        image.save(out, format=fmt, **options)
+        encoded = out.getvalue()
+        if image.size == original_size and original_format == fmt and len(encoded) >= len(data):
+            return data, original_size
+        return encoded, image.size
+
+
+# Base64 payloads of preprocessed images, keyed by the hash of the original file
+# plus the preprocessing settings. Payloads are appended to one data file that is
+# read through mmap; index.jsonl maps each key to its (offset, length).
+class ImageCache:
+    def __init__(self, path=CACHE_DIR, max_side=MAX_SIDE, fmt=FORMAT):
+        self.path = path
+        self.max_side = max_side
+        self.format = fmt
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.hashes = {}  # (path, size, mtime) -> content hash, so unchanged files are not re-read
+        self.index = {}
+        self.index_end = 0  # bytes of index.jsonl read so far
+        os.makedirs(path, exist_ok=True)
+        self.data_path = os.path.join(path, "images.b64")
+        self.index_path = os.path.join(path, "index.jsonl")
+        self.data = open(self.data_path, "ab+")
+        self.view = None
+        self.view_size = 0
+        self.load_index()
+
+    # Reads the index entries appended since the last call, including other processes' ones
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self.index_end)
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break  # torn last line from an interrupted write
+                self.index_end += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.index[entry["key"]] = entry
+
+    # Shard workers and queue worker processes share one cache directory: an
+    # append (data offset, payload, index line) holds an exclusive lock on the data file
+    @contextmanager
+    def append_lock(self):
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self.data.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.data.fileno(), fcntl.LOCK_UN)
+
+    def key(self, path, max_side):
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self.hashes.get(file_key)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self.hashes[file_key] = digest
+        return f"{digest}:{max_side}:{self.format}"
+
+    def read(self, entry):
+        with self.lock:
+            end = entry["offset"] + entry["length"]
+            if self.view is None or end > self.view_size:
+                # The file grew since it was mapped
+                if self.view is not None:
+                    self.view.close()
+                self.data.flush()
+                self.view_size = os.fstat(self.data.fileno()).st_size
+                self.view = mmap.mmap(self.data.fileno(), 0, access=mmap.ACCESS_READ)
+            return self.view[entry["offset"]:end].decode("ascii")
+
+    # Returns (mime type, base64 payload) for an image file, preprocessing it on first use.
+    # max_side overrides the cache's default for this one image.
+    def get(self, path, max_side=None):
+        max_side = max_side or self.max_side
+        key = self.key(path, max_side)
+        entry = self.index.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry["mime"], self.read(entry)
+
+        with open(path, "rb") as f:
+            encoded, size = encode(f.read(), max_side, self.format)
+        payload = base64.b64encode(encoded)
+        with self.lock, self.append_lock():
+            self.load_index()
+            entry = self.index.get(key)
+            if entry is None:
+                self.misses += 1
+                self.data.seek(0, os.SEEK_END)
+                entry = {"key": key, "offset": self.data.tell(), "length": len(payload),
+                         "mime": MIME_TYPES.get(self.format, "image/png"), "size": list(size),
+                         "source_bytes": os.path.getsize(path)}
+                self.data.write(payload)
+                self.data.flush()
+                with open(self.index_path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+                self.index[key] = entry
+        return entry["mime"], self.read(entry)
+
+    def data_url(self, path, max_side=None):
+        mime, payload = self.get(path, max_side)
+        return f"data:{mime};base64,{payload}"
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "entries": len(self.index),
+            "source_bytes": sum(e.get("source_bytes", 0) for e in self.index.values()),
+            "cached_bytes": sum(e["length"] for e in self.index.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        with self.lock:
+            if self.view is not None:
+                self.view.close()
+                self.view = None
+            self.data.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
+
+
+def dataset_images(datasets=IMAGE_DATASETS):
+    paths = []
+    for dataset in datasets:
+        for q in questions.query(dataset):
+            paths.extend(image_paths(q))
+    return list(dict.fromkeys(paths))
+
+
+def warm_command(args):
+    cache = ImageCache(args.path, args.max_side, args.format.upper())
+    paths = dataset_images(args.datasets or IMAGE_DATASETS)
+    missing = [p for p in paths if not os.path.exists(p)]
+    for p in missing:
+        print(f"⚠️ Missing image {p}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(pool.map(cache.get, [p for p in paths if os.path.exists(p)]))
+    s = cache.stats()
+    cache.close()
+    print(f"✅ {len(paths) - len(missing)} images ready in {time.perf_counter() - start:.2f}s "
+          f"({s['misses']} preprocessed, {s['hits']} already cached)")
+    print(f"   {s['source_bytes'] / 1e6:.1f} MB of originals -> {s['cached_bytes'] / 1e6:.1f} MB of base64 in {cache.path}")
+    return 0
+
+
+def stats_command(args):
+    cache = ImageCache(args.path)
+    print(json.dumps(cache.stats(), indent=2))
+    cache.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.images", description="Preprocessed image cache")
+    parser.add_argument("--path", default=CACHE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warm_parser = commands.add_parser("warm", help="preprocess every image the image datasets refer to")
+    warm_parser.add_argument("datasets", nargs="*", help=f"image datasets (default: {len(IMAGE_DATASETS)} known sets)")
+    warm_parser.add_argument("--max-side", type=int, default=MAX_SIDE)
+    warm_parser.add_argument("--format", default=FORMAT, choices=["PNG", "JPEG", "WEBP", "png", "jpeg", "webp"])
+    warm_parser.set_defaults(func=warm_command)
+
+    stats_parser = commands.add_parser("stats", help="show what the cache holds")
+    stats_parser.set_defaults(func=stats_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
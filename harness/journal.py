@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+from harness import trace
+
+
+def task_key(model, prompt_style, question_id):
+    return (str(model), str(prompt_style), str(question_id))
+
+
+def record_key(record):
+    return task_key(record["model"], record["prompt_style"], record["question_id"])
+
+
+def load(path):
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A crash mid-write can only tear the last line; drop it and redo that question
+                print(f"⚠️  Ignoring unreadable journal line in {path}")
+    return records
+
+
+# Append-only JSONL log of finished evaluate_question records. Every append is
+# flushed and fsynced, so at most the record being written is lost on a crash.
+# invalidate: question_ids whose recorded evaluations are dropped on resume, so they are asked again.
+class Journal:
+    def __init__(self, path, resume=False, invalidate=None):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self.records = load(path) if resume else []
+        dropped = 0
+        if invalidate:
+            kept = [r for r in self.records if str(r.get("question_id")) not in invalidate]
+            dropped = len(self.records) - len(kept)
+            self.records = kept
+        if resume and os.path.exists(path):
+            # Rewrite without any torn tail so new appends start on a clean line, even
+            # when the torn line is all the journal holds. The
+            # copy replaces the journal only once it is on disk, so an interrupted
+            # rewrite leaves the old journal in place.
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for r in self.records:
+                    f.write(json.dumps(r, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with trace.span("journal append", "io"), self.lock:
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            self.file.close()
@@ -0,0 +1,254 @@
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from harness.providers import content_text
+
+# Defaults
+TOKEN_CHARS = 4       # rough characters per token, for estimated token counts
+IMAGE_TOKENS = 765    # estimate for one attached image
+QUANTILES = [0.5, 0.95, 0.99]
+TIMINGS = ["latency", "ttfb", "queue_wait"]
+
+# Calls of the evaluation running in this context. Threads the evaluation fans
+# out to (self-consistency samples, tree-of-thought branches) get it through submit().
+_evaluation = contextvars.ContextVar("gmat_evaluation", default=None)
+
+
+def submit(executor, fn, *args):
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def estimate_tokens(text, images=0):
+    return (len(text) + TOKEN_CHARS - 1) // TOKEN_CHARS + images * IMAGE_TOKENS
+
+
+# Nearest-rank quantile of sorted values
+def quantile(values, q):
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(q * len(values) + 0.5) - 1))]
+
+
+# Every provider call of a run, per (section, model): timing samples for the
+# quantiles and running totals for the counters
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def add(self, section_name, call):
+        key = (section_name, call["model"])
+        with self.lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = {"provider": call["provider"], "calls": 0, "cached": 0, "failed": 0,
+                                        "retries": 0, "prompt_tokens": 0, "response_tokens": 0,
+                                        **{name: [] for name in TIMINGS}}
+            s["calls"] += 1
+            s["cached"] += call["cached"]
+            s["failed"] += "error" in call
+            s["retries"] += call["retries"]
+            s["prompt_tokens"] += call["prompt_tokens"]
+            s["response_tokens"] += call["response_tokens"]
+            if call["cached"]:
+                # A cache hit says nothing about the provider's speed
+                return
+            for name in TIMINGS:
+                if call.get(name) is not None:
+                    s[name].append(call[name])
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+
+    # {model: {section: summary}}; "" collects calls made outside an evaluation
+    def snapshot(self):
+        with self.lock:
+            series = {key: dict(s, **{name: sorted(s[name]) for name in TIMINGS}) for key, s in self.series.items()}
+        out = {}
+        for (section_name, model), s in sorted(series.items(), key=lambda item: (item[0][1], item[0][0])):
+            summary = {k: s[k] for k in ("provider", "calls", "cached", "failed", "retries", "prompt_tokens",
+                                         "response_tokens")}
+            for name in TIMINGS:
+                values = s[name]
+                summary[name] = {"count": len(values), "sum": round(sum(values), 6),
+                                 **{f"p{int(q * 100)}": quantile(values, q) for q in QUANTILES}}
+            out.setdefault(model, {})[section_name] = summary
+        return out
+
+
+registry = Registry()
+
+
+# Collects the calls made while evaluating one question; annotate() then puts
+# their totals on the record. queued is when the evaluation started waiting for
+# the engine's concurrency slots: that wait is queue wait of its first call
+# the cache did not answer (the registry keeps no timings of cache hits).
+@contextmanager
+def evaluation(section_name, queued=None):
+    start = time.perf_counter()
+    holder = {"section": section_name, "calls": [], "start": start if queued is None else queued,
+              "slot_wait": 0.0 if queued is None else start - queued, "lock": threading.Lock()}
+    token = _evaluation.set(holder)
+    try:
+        yield holder
+    finally:
+        _evaluation.reset(token)
+        holder["latency"] = time.perf_counter() - holder["start"]
+
+
+# One finished (or failed) provider call. stats is what resilience.call measured;
+# a cache hit has no stats and costs only its lookup.
+def record_call(model, provider, messages, response, stats=None, cached=False, error=None, elapsed=None):
+    prompt = "\n".join(content_text(m.get("content", "")) for m in messages)
+    images = sum(1 for m in messages if not isinstance(m.get("content"), str)
+                 for part in m["content"] if part.get("type") == "image_url")
+    stats = stats or {}
+    call = {
+        "model": model,
+        "provider": provider,
+        "cached": cached,
+        "attempts": stats.get("attempts", 0 if cached else 1),
+        "retries": max(0, stats.get("attempts", 1) - 1),
+        "queue_wait": stats.get("queue_wait", 0.0),
+        "ttfb": stats.get("ttfb", elapsed),
+        "latency": stats.get("latency", elapsed),
+        "prompt_chars": len(prompt),
+        "response_chars": len(response or ""),
+        "prompt_tokens": estimate_tokens(prompt, images),
+        "response_tokens": estimate_tokens(response or ""),
+    }
+    if error is not None:
+        call["error"] = str(error)
+    holder = _evaluation.get()
+    if holder is not None:
+        with holder["lock"]:
+            slot_wait = 0.0
+            if not cached:
+                slot_wait, holder["slot_wait"] = holder["slot_wait"], 0.0
+            holder["calls"].append(call)
+        if slot_wait:
+            call["queue_wait"] += slot_wait
+            if call["latency"] is not None:
+                call["latency"] += slot_wait
+    registry.add(holder["section"] if holder else "", call)
+    return call
+
+
+# Per-evaluation totals on the record: wall time under "latency" (the column the
+# results store already reads) and the call details under "usage"
+def annotate(record, holder):
+    if record is None:
+        return record
+    calls = holder["calls"]
+    record["latency"] = round(holder.get("latency", time.perf_counter() - holder["start"]), 3)
+    record["usage"] = {
+        "calls": len(calls),
+        "provider": calls[0]["provider"] if calls else None,
+        "cached": sum(1 for c in calls if c["cached"]),
+        "retries": sum(c["retries"] for c in calls),
+        "queue_wait": round(holder["slot_wait"] + sum(c["queue_wait"] or 0 for c in calls), 3),
+        "ttfb": round(calls[0]["ttfb"], 3) if calls and calls[0]["ttfb"] is not None else None,
+        "call_latency": round(sum(c["latency"] or 0 for c in calls), 3),
+        "prompt_chars": sum(c["prompt_chars"] for c in calls),
+        "response_chars": sum(c["response_chars"] for c in calls),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "response_tokens": sum(c["response_tokens"] for c in calls),
+    }
+    return record
+
+
+def label_text(labels):
+    return ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for k, v in labels.items())
+
+
+# Prometheus text exposition format: timings as summaries with p50/p95/p99, the rest as counters
+def prometheus(snapshot):
+    lines = []
+    for name in TIMINGS:
+        metric = f"gmat_call_{name}_seconds"
+        lines.append(f"# HELP {metric} Provider call {name.replace('_', ' ')} per model and section")
+        lines.append(f"# TYPE {metric} summary")
+        for model, by_section in snapshot.items():
+            for section_name, s in by_section.items():
+                labels = {"model": model, "section": section_name}
+                for q in QUANTILES:
+                    value = s[name][f"p{int(q * 100)}"]
+                    if value is not None:
+                        lines.append(f"{metric}{{{label_text(dict(labels, quantile=q))}}} {value:.6f}")
+                lines.append(f"{metric}_sum{{{label_text(labels)}}} {s[name]['sum']:.6f}")
+                lines.append(f"{metric}_count{{{label_text(labels)}}} {s[name]['count']}")
+    for name, help_text in (("calls", "Provider calls, cache hits included"), ("cached", "Calls answered by the cache"),
+                            ("failed", "Calls that exhausted their retries"), ("retries", "Retried provider attempts"),
+                            ("prompt_tokens", "Estimated prompt tokens"),
+                            ("response_tokens", "Estimated response tokens")):
+        metric = f"gmat_{name}_total"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for model, by_section in snapshot.items():
+            for section_name, s in by_section.items():
+                labels = {"model": model, "section": section_name, "provider": s["provider"]}
+                lines.append(f"{metric}{{{label_text(labels)}}} {s[name]}")
+    return "\n".join(lines) + "\n"
+
+
+# Writes <prefix>.json and <prefix>.prom
+def export(prefix, snapshot=None):
+    snapshot = registry.snapshot() if snapshot is None else snapshot
+    os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+    with open(prefix + ".json", "w") as f:
+        json.dump(snapshot, f, indent=2)
+    with open(prefix + ".prom", "w") as f:
+        f.write(prometheus(snapshot))
+    return prefix + ".json", prefix + ".prom"
+
+
+def seconds(value):
+    return "-" if value is None else f"{value:.2f}s"
+
+
+# One line per model and section, slowest total first
+def summary(snapshot=None):
+    snapshot = registry.snapshot() if snapshot is None else snapshot
+    rows = [(model, section_name, s) for model, by_section in snapshot.items() for section_name, s in by_section.items()]
+    if not rows:
+        return "No provider calls recorded"
+    rows.sort(key=lambda row: -row[2]["latency"]["sum"])
+    lines = [f"{'model':<20} {'section':<12} {'calls':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'ttfb p50':>9} "
+             f"{'wait p50':>9} {'total':>9} {'tokens':>9}"]
+    for model, section_name, s in rows:
+        latency = s["latency"]
+        lines.append(f"{model:<20} {section_name or '-':<12} {s['calls']:>6} {seconds(latency['p50']):>7} "
+                     f"{seconds(latency['p95']):>7} {seconds(latency['p99']):>7} {seconds(s['ttfb']['p50']):>9} "
+                     f"{seconds(s['queue_wait']['p50']):>9} {latency['sum']:>8.1f}s "
+                     f"{s['prompt_tokens'] + s['response_tokens']:>9}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.metrics",
+                                     description="Show or convert the call metrics a run exported")
+    parser.add_argument("path", help="metrics JSON written by run --metrics")
+    parser.add_argument("--format", choices=["table", "prometheus", "json"], default="table")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if args.format == "prometheus":
+        sys.stdout.write(prometheus(snapshot))
+    elif args.format == "json":
+        print(json.dumps(snapshot, indent=2))
+    else:
+        print(summary(snapshot))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import argparse
+import json
+import re
+import sys
+import time
+
+# Bump when the rules change: the question store reloads every source and reports what changed
+VERSION = 1
+
+SUPERSCRIPTS = str.maketrans("0123456789+-", "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻")
+SYMBOLS = {
+    "times": "×", "cdot": "·", "div": "÷", "pm": "±", "le": "≤", "leq": "≤", "ge": "≥", "geq": "≥",
+    "ne": "≠", "neq": "≠", "approx": "≈", "pi": "π", "infty": "∞",
+    "%": "%", "$": "$", ",": " ", ";": " ", "!": "",
+}
+ATOM = re.compile(r"[\w.]+")
+
+# Every rule is one alternative of a single pattern, so a string is scanned once
+# whatever it contains. The group that matched names the rule.
+TOKEN = re.compile(r"""
+      \\u(?P<escape>[0-9a-fA-F]{4})                         # escaped unicode left in the text: \u221a
+    | (?P<open>\\[(\[])\s*                                  # LaTeX inline / display delimiters
+    | \s*(?P<close>\\[)\]])
+    | \\sqrt\s*(?:\{(?P<root>[^{}]*)\}|(?P<root_atom>\d+|[A-Za-z]))
+    | \\frac\s*\{(?P<numerator>[^{}]*)\}\s*\{(?P<denominator>[^{}]*)\}
+    | \s*\\text\s*\{(?P<text>[^{}]*)\}\s*                    # \text{ or } between two terms keeps one space a side
+    | (?P<degree>\^\s*\{?\\circ\}?|\\circ|\\degree)(?![A-Za-z])
+    | \^\{(?P<power_braced>[-+]?\d+)\}
+    | \^(?P<power>[-+]?\d+)
+    | \\(?P<symbol>times|cdot|div|pm|leq?|geq?|neq?|approx|pi|infty|[%$,;!])(?![A-Za-z])
+""", re.VERBOSE)
+
+
+def group(text):
+    return text if ATOM.fullmatch(text) else f"({text})"
+
+
+def replace(match):
+    rule = match.lastgroup
+    value = match.group(rule)
+    if rule == "escape":
+        return chr(int(value, 16))
+    if rule in ("open", "close"):
+        return ""
+    if rule in ("root", "root_atom"):
+        return "√" + group(normalize_text(value).strip())
+    if rule == "denominator":
+        numerator = normalize_text(match.group("numerator")).strip()
+        return f"{group(numerator)}/{group(normalize_text(value).strip())}"
+    if rule == "text":
+        whole = match.group(0)
+        lead = " " if whole[:1].isspace() or value[:1].isspace() else ""
+        trail = " " if whole[-1:].isspace() or value[-1:].isspace() else ""
+        return lead + value.strip() + trail
+    if rule == "degree":
+        return "°"
+    if rule in ("power", "power_braced"):
+        return value.translate(SUPERSCRIPTS)
+    return SYMBOLS[value]
+
+
+# One pass over the string; text without a backslash or caret is returned as is
+def normalize_text(text):
+    if "\\" not in text and "^" not in text:
+        return text
+    return TOKEN.sub(replace, text)
+
+
+# Normalizes every string of a question in place: containers are walked, not
+# copied, and only strings that change are replaced. Keys are left alone.
+def normalize_question(q):
+    stack = [q]
+    while stack:
+        node = stack.pop()
+        for k, v in (node.items() if isinstance(node, dict) else enumerate(node)):
+            if isinstance(v, str):
+                text = normalize_text(v)
+                if text is not v:
+                    node[k] = text
+            elif isinstance(v, (dict, list)):
+                stack.append(v)
+    return q
+
+
+def normalize_stream(questions):
+    for q in questions:
+        yield normalize_question(q)
+
+
+def strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from strings(v)
+
+
+# What classify.py did: a chain of replaces plus a regex per string, on a copied tree
+def replace_chain(text):
+    text = text.replace("\\u221a", "√").replace("\\u00b2", "²").replace("\\u00b3", "³").replace("\\u00b0", "°")
+    return re.sub(r"\\\\\((.*?)\\\\\)", r"\1", text)
+
+
+def copy_clean(value):
+    if isinstance(value, dict):
+        return {k: copy_clean(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_clean(v) for v in value]
+    if isinstance(value, str):
+        return replace_chain(value)
+    return value
+
+
+def bench_command(args):
+    # Imported here: the question store itself imports this module
+    from harness import questions
+
+    datasets = []
+    for path in args.files or questions.SOURCES:
+        with open(path, "r", encoding="utf-8") as f:
+            datasets.append(json.load(f))
+    texts = [s for data in datasets for s in strings(data)]
+    size = sum(len(s.encode("utf-8")) for s in texts) * args.repeat
+    changed = sum(1 for s in texts if normalize_text(s) != s)
+    print(f"{len(texts)} strings, {size / args.repeat / 1e6:.2f} MB per pass, {changed} changed by normalization")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for s in texts:
+            normalize_text(s)
+    single = time.perf_counter() - start
+
+    # Untouched copies for every pass, made outside the timing
+    copies = [json.loads(json.dumps(data)) for _ in range(args.repeat) for data in datasets]
+    start = time.perf_counter()
+    for data in copies:
+        normalize_question(data)
+    in_place = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for data in datasets:
+            copy_clean(data)
+    chain = time.perf_counter() - start
+
+    print(f"single pass, strings:       {size / single / 1e6:8.1f} MB/s  ({len(texts) * args.repeat / single:,.0f} strings/s)")
+    print(f"single pass, in place:      {size / in_place / 1e6:8.1f} MB/s")
+    print(f"replace chain + tree copy:  {size / chain / 1e6:8.1f} MB/s  (classify.py, fewer rules)")
+    return 0
+
+
+def preview_command(args):
+    from harness import questions
+
+    shown = 0
+    for path in args.files or questions.SOURCES:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for s in strings(data):
+            text = normalize_text(s)
+            if text != s and shown < args.limit:
+                print(f"{questions.source_name(path)}:\n  - {s[:160]!r}\n  + {text[:160]!r}")
+                shown += 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.normalize", description="Dataset text normalization")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench_parser = commands.add_parser("bench", help="normalization throughput over the source datasets")
+    bench_parser.add_argument("files", nargs="*", help="dataset files (default: every question store source)")
+    bench_parser.add_argument("--repeat", type=int, default=20)
+    bench_parser.set_defaults(func=bench_command)
+
+    preview_parser = commands.add_parser("preview", help="show strings normalization changes")
+    preview_parser.add_argument("files", nargs="*", help="dataset files (default: every question store source)")
+    preview_parser.add_argument("--limit", type=int, default=40)
+    preview_parser.set_defaults(func=preview_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
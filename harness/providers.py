@@ -0,0 +1,266 @@
+import hashlib
+import http.client
+import json
+import os
+import random
+import socket
+import threading
+import time
+import urllib.parse
+
+from harness import config, resilience
+
+LETTERS = "ABCDE"
+
+# Defaults
+# g4f keeps provider auth (HAR captures, cookies, Blackbox's validated value) in
+# a har_and_cookies directory; every old runner folder has a copy of the same one
+COOKIE_DIRS = [
+    config.path("Quant", "ProblemSolving", "har_and_cookies"),
+    config.path("Verbal", "har_and_cookies"),
+    config.path("DataInsights", "DataSuffciency", "DSquestions", "har_and_cookies"),
+    config.path("DataInsights", "IntergratedReasoning", "IRquestions", "har_and_cookies"),
+]
+COOKIES_DIR = os.environ.get("GMAT_COOKIES_DIR") or next((d for d in COOKIE_DIRS if os.path.isdir(d)),
+                                                         config.path("har_and_cookies"))
+PROVIDER = os.environ.get("GMAT_PROVIDER", "g4f").lower()  # g4f, api or fake
+API_BASE = os.environ.get("GMAT_API_BASE", "http://localhost:1337/v1")  # g4f's own API server by default
+API_KEY = os.environ.get("GMAT_API_KEY", "")
+API_POOL = int(os.environ.get("GMAT_API_POOL", 16))  # idle keep-alive connections kept per host
+API_TIMEOUT = float(os.environ.get("GMAT_CALL_TIMEOUT", 180))
+
+
+# Every provider takes the chat messages and returns the response text.
+# namespace keeps a provider's responses apart in the cache; None shares g4f's.
+class G4FProvider:
+    name = "g4f"
+    namespace = None
+
+    def __init__(self, cookies_dir=COOKIES_DIR):
+        self.cookies_dir = cookies_dir
+        self.g4f = None
+        self.lock = threading.Lock()
+
+    # Imports g4f and points it at the auth directory once per process, instead
+    # of resolving both again for every question
+    def session(self):
+        with self.lock:
+            if self.g4f is None:
+                import g4f
+                try:
+                    from g4f import cookies
+                except ImportError:
+                    cookies = None
+                if cookies is not None and os.path.isdir(self.cookies_dir):
+                    if hasattr(cookies, "set_cookies_dir"):
+                        cookies.set_cookies_dir(self.cookies_dir)
+                    if hasattr(cookies, "read_cookie_files"):
+                        cookies.read_cookie_files(self.cookies_dir)
+                self.g4f = g4f
+            return self.g4f
+
+    def create(self, model, messages, **params):
+        return self.session().ChatCompletion.create(model=model, messages=messages, **params)
+
+
+# Keep-alive HTTP/1.1 connections to one host, shared by every calling thread.
+# A connection goes back to the pool after each complete response, so calls after
+# the first few skip the TCP and TLS handshakes. A pooled connection the server
+# closed while idle is replaced once, transparently.
+class ConnectionPool:
+    def __init__(self, base_url, size=API_POOL, timeout=API_TIMEOUT):
+        parts = urllib.parse.urlsplit(base_url)
+        self.secure = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.secure else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+        self.reused = 0
+
+    def acquire(self, fresh=False):
+        with self.lock:
+            self.requests += 1
+            if self.idle and not fresh:
+                self.reused += 1
+                return self.idle.pop(), True
+            self.opened += 1
+        connection = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        return connection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, conn):
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    # (status, body bytes)
+    def request(self, method, path, body=None, headers=None):
+        fresh = False
+        while True:
+            conn, reused = self.acquire(fresh)
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                    # Headers and body go out as separate writes; without this the second one
+                    # waits for the server's delayed ACK on every call of a kept-alive connection
+                    conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                conn.request(method, self.prefix + path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                resilience.first_byte()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                if reused:
+                    fresh = True
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self.release(conn)
+            return response.status, data
+
+    def stats(self):
+        with self.lock:
+            return {"opened": self.opened, "requests": self.requests, "reused": self.reused, "idle": len(self.idle)}
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+# Any OpenAI-compatible chat completions endpoint, by default g4f's API server
+# (`g4f api`), which keeps provider auth and sessions warm in one long-lived
+# process. Calls go over the pooled keep-alive connections above.
+class APIProvider:
+    name = "api"
+    namespace = None
+
+    def __init__(self, base_url=API_BASE, api_key=API_KEY, pool_size=API_POOL, timeout=API_TIMEOUT):
+        self.base_url = base_url
+        self.pool = ConnectionPool(base_url, pool_size, timeout)
+        self.headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    def create(self, model, messages, **params):
+        body = json.dumps({"model": str(getattr(model, "name", model)), "messages": messages, **params},
+                          ensure_ascii=False).encode("utf-8")
+        status, data = self.pool.request("POST", "/chat/completions", body, self.headers)
+        if status >= 400:
+            raise ConnectionError(f"{self.base_url} answered {status}: {data[:200].decode('utf-8', 'replace')}")
+        return json.loads(data)["choices"][0]["message"]["content"]
+
+    def stats(self):
+        return self.pool.stats()
+
+
+# Multimodal messages carry a list of parts; images count by a digest of their payload
+def content_text(content):
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content:
+        if part.get("type") == "text":
+            parts.append(part["text"])
+        else:
+            url = part.get("image_url", {}).get("url", "")
+            parts.append(f"[image {hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}]")
+    return "\n".join(parts)
+
+
+# Deterministic local stand-in for g4f. The same (model, prompt) always gets the
+# same latency, failure decision and answer, so benchmark runs are repeatable.
+# answer_key maps a prompt to its correct letter; without it the fake picks
+# any letter and accuracy is meaningless.
+class FakeProvider:
+    name = "fake"
+    namespace = "fake"
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, accuracy=0.5,
+                 answer_key=None, seed=0, sleep=True):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.accuracy = accuracy
+        self.answer_key = answer_key or {}
+        self.seed = seed
+        self.sleep = sleep
+        self.calls = 0
+        self.attempts = {}
+        self.lock = threading.Lock()
+
+    def _rng(self, model, prompt):
+        digest = hashlib.sha256(f"{self.seed}|{model}|{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def create(self, model, messages, **params):
+        prompt = content_text(messages[-1]["content"])
+        name = getattr(model, "name", model)
+        rng = self._rng(name, prompt)
+        with self.lock:
+            self.calls += 1
+            attempt = self.attempts.get((name, prompt), 0)
+            self.attempts[(name, prompt)] = attempt + 1
+
+        # Log-normal around latency_ms gives the long tail real providers show
+        if self.latency_ms > 0 and self.sleep:
+            delay = rng.lognormvariate(0, 0.5) * self.latency_ms + rng.uniform(0, self.jitter_ms)
+            time.sleep(delay / 1000.0)
+
+        # Failures depend on the attempt number too, so a retry can succeed
+        if self._rng(name, f"{prompt}|{attempt}").random() < self.error_rate:
+            raise ConnectionError("fake provider error")
+
+        correct = self.answer_key.get(prompt)
+        if correct is not None and rng.random() < self.accuracy:
+            answer = correct
+        else:
+            choices = [c for c in LETTERS if c != correct] or list(LETTERS)
+            answer = rng.choice(choices)
+        return (
+            "Thought 1: Restate the question.\n"
+            "Thought 2: Work through the options.\n"
+            f"Answer: {answer}\n"
+            "Explanation: Deterministic response from the local fake provider."
+        )
+
+
+PROVIDERS = {"g4f": G4FProvider, "api": APIProvider, "fake": FakeProvider}
+
+
+# Namespace of the provider GMAT_PROVIDER selects, known without creating it
+def environment_namespace():
+    provider = PROVIDERS.get(PROVIDER)
+    return provider.namespace if provider else None
+
+
+# GMAT_PROVIDER=api sends calls to GMAT_API_BASE over pooled connections.
+# GMAT_PROVIDER=fake switches every runner to the fake provider, e.g.
+# GMAT_PROVIDER=fake GMAT_FAKE_LATENCY_MS=800 GMAT_FAKE_ERROR_RATE=0.05
+def from_environment():
+    kind = PROVIDER
+    if kind == "g4f":
+        return G4FProvider()
+    if kind == "api":
+        return APIProvider()
+    if kind == "fake":
+        return FakeProvider(
+            latency_ms=float(os.environ.get("GMAT_FAKE_LATENCY_MS", 0)),
+            jitter_ms=float(os.environ.get("GMAT_FAKE_JITTER_MS", 0)),
+            error_rate=float(os.environ.get("GMAT_FAKE_ERROR_RATE", 0)),
+            accuracy=float(os.environ.get("GMAT_FAKE_ACCURACY", 0.5)),
+            seed=int(os.environ.get("GMAT_FAKE_SEED", 0)),
+        )
+    raise ValueError(f"Unknown GMAT_PROVIDER: {kind!r}")
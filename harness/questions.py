@@ -0,0 +1,435 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from harness import config, normalize, trace
+
+# Defaults
+STORE_PATH = os.environ.get("GMAT_QUESTION_STORE", config.path(".cache", "questions.sqlite"))
+FETCH_SIZE = 256  # rows pulled from sqlite at a time while streaming
+SCHEMA_VERSION = 4  # an older store is dropped and rebuilt from the sources
+
+# Question sets the store is built from. The classify scripts' split files are
+# not listed: every subset they hold is a query on one of these. quant_algebra.json
+# stays a source because most of its questions are not in ProblemSolving.json.
+SOURCES = [
+    config.path("Quant", "ProblemSolving", "ProblemSolving.json"),
+    config.path("Quant", "ProblemSolving", "quant_algebra.json"),
+    config.path("Verbal", "CriticalReasoning.json"),
+    config.path("Verbal", "ReadingComprehension.json"),
+    config.path("DataInsights", "DataSuffciency", "DSquestions", "DataSufficiency.json"),
+    config.path("DataInsights", "DataSuffciency", "Imagedata", "DataSufficiencyImg.json"),
+    config.path("DataInsights", "IntergratedReasoning", "IRquestions", "IntegratedReasoning.json"),
+    config.path("DataInsights", "IntergratedReasoning", "Imagedata", "IntergratedReasoningImg.json"),
+    config.path("DataInsights", "IntergratedReasoning", "Imagedata", "IR_Multi_Source_ReasoningIMG.json"),
+]
+
+# Indexed column -> question field
+FIELDS = {
+    "section": "section",
+    "subtype": "subtype",
+    "subtype_type": "subtype-type",
+    "subtype_subtype": "subtype-subtype",
+    "difficulty": "difficulty",
+}
+
+
+# Indexed values are compared case- and whitespace-insensitively, the way the runners always filtered
+def key(value):
+    return " ".join(str(value).split()).lower() if value is not None else ""
+
+
+def source_name(path):
+    path = os.path.abspath(source_path(path))
+    return os.path.relpath(path, config.ROOT) if path.startswith(config.ROOT + os.sep) else path
+
+
+def source_path(name):
+    return name if os.path.isabs(name) else config.path(name)
+
+
+# Questions of a parsed dataset file in file order. Passage sets (reading comprehension,
+# multi-source reasoning) are flattened: each question carries its passage_text
+# and the passage's position.
+def dataset_questions(data):
+    if isinstance(data, dict):
+        data = data.get("questions", data.get("Questions", data.get("Allquestions", [])))
+    for i, item in enumerate(data):
+        if isinstance(item.get("questions"), list):
+            for q in item["questions"]:
+                q["passage_text"] = item.get("passage", item.get("Paragraph", ""))
+                q["passage_index"] = i
+                yield q
+        else:
+            yield item
+
+
+def question_hash(q):
+    return hashlib.sha256(json.dumps(q, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# (question_id, occurrence) -> hash. question_id is not unique in every dataset,
+# so repeated ids are told apart by the order they appear in.
+def by_occurrence(pairs):
+    seen = {}
+    keyed = {}
+    for question_id, digest in pairs:
+        occurrence = seen.get(question_id, 0)
+        seen[question_id] = occurrence + 1
+        keyed[(question_id, occurrence)] = digest
+    return keyed
+
+
+# Every question of every source in one SQLite table, normalized (see harness.normalize)
+# and indexed on the fields the runners select by.
+# A source is reloaded the first time it is queried after its contents changed.
+# Each reload records the questions it added, changed or removed until every run took them (see take_changes).
+class QuestionStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            for table in ("questions", "sources", "changes", "consumers"):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        columns = ", ".join(f"{column} TEXT NOT NULL" for column in FIELDS)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS questions (
+                source TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                question_id TEXT NOT NULL,
+                {columns},
+                hash TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (source, position)
+            )
+        """)
+        for column in FIELDS:
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS questions_{column} ON questions ({column}, source, position)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                normalizer INTEGER NOT NULL,
+                questions INTEGER NOT NULL,
+                loaded REAL NOT NULL
+            )
+        """)
+        # What every reload of each source changed, oldest first; loaded matches sources.loaded
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                change TEXT NOT NULL,
+                loaded REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS changes_source ON changes (source, id)")
+        # Last change id each consumer (a journal, a queue's section) has taken, per source
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS consumers (
+                consumer TEXT NOT NULL,
+                source TEXT NOT NULL,
+                seen INTEGER NOT NULL,
+                PRIMARY KEY (consumer, source)
+            )
+        """)
+
+    def stored(self, name):
+        return self.conn.execute("SELECT size, mtime_ns, normalizer, hash FROM sources WHERE source = ?",
+                                 (name,)).fetchone()
+
+    # Reload a source whose contents changed since it was stored. The file is only
+    # hashed when its size or mtime moved, and only reloaded when the hash did.
+    # Questions are stored normalized, so a new normalizer version reloads it too.
+    # Returns the reload's summary, or None when the stored copy was current.
+    def ensure(self, path, force=False):
+        name = source_name(path)
+        file_path = source_path(name)
+        stat = os.stat(file_path)
+        current = (stat.st_size, stat.st_mtime_ns, normalize.VERSION)
+        with self.lock:
+            stored = self.stored(name)
+            if not force and stored is not None and tuple(stored[:3]) == current:
+                return None
+            with open(file_path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have loaded it while we waited for the write lock
+                stored = self.stored(name)
+                if not force and stored is not None and (stored[2], stored[3]) == (normalize.VERSION, digest):
+                    # Touched but not edited: remember the new stat, keep the questions
+                    self.conn.execute("UPDATE sources SET size = ?, mtime_ns = ? WHERE source = ?", (*current[:2], name))
+                    self.conn.execute("COMMIT")
+                    return None
+                loaded = time.time()
+                with trace.span("reload source", "data", source=name):
+                    summary = self.load(name, json.loads(data), loaded, first=stored is None)
+                self.conn.execute("INSERT OR REPLACE INTO sources (source, size, mtime_ns, normalizer, hash, questions, "
+                                  "loaded) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (name, *current, digest, summary["questions"], loaded))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return summary
+
+    # Replace a source's questions and record how they differ from the stored ones.
+    # The first load of a source is the baseline and records no changes.
+    def load(self, name, data, loaded, first=False):
+        old = by_occurrence(self.conn.execute(
+            "SELECT question_id, hash FROM questions WHERE source = ? ORDER BY position", (name,)))
+        rows = []
+        for position, q in enumerate(normalize.normalize_stream(dataset_questions(data))):
+            body = json.dumps(q, ensure_ascii=False)
+            rows.append((name, position, str(q.get("question_id", "")), *(key(q.get(field)) for field in FIELDS.values()),
+                         question_hash(q), body))
+        new = by_occurrence((row[2], row[-2]) for row in rows)
+
+        summary = {"source": name, "questions": len(rows), "first": first, "added": [], "changed": [], "removed": []}
+        if not first:
+            for k, digest in new.items():
+                if k not in old:
+                    summary["added"].append(k[0])
+                elif old[k] != digest:
+                    summary["changed"].append(k[0])
+            summary["removed"] = [k[0] for k in old if k not in new]
+
+        columns = ["source", "position", "question_id", *FIELDS, "hash", "body"]
+        self.conn.execute("DELETE FROM questions WHERE source = ?", (name,))
+        self.conn.executemany(f"INSERT INTO questions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+        self.conn.executemany("INSERT INTO changes (source, question_id, change, loaded) VALUES (?, ?, ?, ?)",
+                              [(name, question_id, change, loaded) for change in ("added", "changed", "removed")
+                               for question_id in summary[change]])
+        return summary
+
+    # {source: reload summary} for every source that had to be reloaded
+    def build(self, sources=SOURCES, force=False):
+        loaded = {}
+        for path in sources:
+            if os.path.exists(path):
+                summary = self.ensure(path, force)
+                if summary is not None:
+                    loaded[summary["source"]] = summary
+        return loaded
+
+    # {source: {"added": [...], "changed": [...], "removed": [...]}} as of each source's latest reload
+    def changes(self, source=None):
+        sql = ("SELECT c.source, c.question_id, c.change FROM changes c "
+               "JOIN sources s ON s.source = c.source AND s.loaded = c.loaded")
+        params = []
+        if source is not None:
+            sql += " WHERE c.source = ?"
+            params.append(source_name(source))
+        found = {}
+        for name, question_id, change in self.conn.execute(sql + " ORDER BY c.id", params):
+            found.setdefault(name, {"added": [], "changed": [], "removed": []})[change].append(question_id)
+        return found
+
+    # (question_ids added or changed by every reload of a source since consumer last
+    # took its changes, mark to pass to take_changes). A consumer that never took any
+    # gets every recorded change.
+    def pending_changes(self, source, consumer):
+        self.ensure(source)
+        name = source_name(source)
+        with self.lock:
+            row = self.conn.execute("SELECT seen FROM consumers WHERE consumer = ? AND source = ?",
+                                    (consumer, name)).fetchone()
+            rows = self.conn.execute("SELECT id, question_id FROM changes WHERE source = ? AND id > ? "
+                                     "AND change IN ('added', 'changed')", (name, row[0] if row else 0)).fetchall()
+            mark = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes WHERE source = ?", (name,)).fetchone()[0]
+        return {question_id for _, question_id in rows}, mark
+
+    # Records that consumer is up to date with a source's changes up to mark
+    # (default: all of them). first only sets the mark of a consumer not seen before.
+    def take_changes(self, source, consumer, mark=None, first=False):
+        name = source_name(source)
+        if mark is None:
+            self.ensure(source)
+        with self.lock:
+            if mark is None:
+                mark = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes WHERE source = ?",
+                                         (name,)).fetchone()[0]
+            verb = "INSERT OR IGNORE" if first else "INSERT OR REPLACE"
+            self.conn.execute(f"{verb} INTO consumers (consumer, source, seen) VALUES (?, ?, ?)", (consumer, name, mark))
+
+    def where(self, source, filters):
+        unknown = set(filters) - set(FIELDS)
+        if unknown:
+            raise KeyError(f"Cannot filter questions by {', '.join(sorted(unknown))}; choose from {', '.join(FIELDS)}")
+        clauses = []
+        params = []
+        if source is None:
+            self.build()
+        else:
+            self.ensure(source)
+            clauses.append("source = ?")
+            params.append(source_name(source))
+        for column, value in filters.items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(key(v) for v in values)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    # Questions matching every filter, in dataset order, decoded one batch at a time.
+    # A filter value may be a list of accepted values.
+    def query(self, source=None, **filters):
+        where, params = self.where(source, filters)
+        # A cursor of its own, so a half-read stream never holds the store's lock
+        conn = sqlite3.connect(self.path, check_same_thread=False) if self.path != ":memory:" else self.conn
+        try:
+            cur = conn.execute(f"SELECT body FROM questions{where} ORDER BY source, position", params)
+            while True:
+                batch = cur.fetchmany(FETCH_SIZE)
+                if not batch:
+                    break
+                for (body,) in batch:
+                    yield json.loads(body)
+        finally:
+            if conn is not self.conn:
+                conn.close()
+
+    def count(self, source=None, **filters):
+        where, params = self.where(source, filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM questions{where}", params).fetchone()[0]
+
+    # Distinct stored values of one indexed column, with their question counts
+    def values(self, column, source=None, **filters):
+        where, params = self.where(source, filters)
+        if column not in FIELDS:
+            raise KeyError(f"Unknown column {column!r}; choose from {', '.join(FIELDS)}")
+        return dict(self.conn.execute(f"SELECT {column}, COUNT(*) FROM questions{where} GROUP BY {column} "
+                                      f"ORDER BY COUNT(*) DESC", params).fetchall())
+
+    def stats(self):
+        sources = self.conn.execute("SELECT source, questions FROM sources ORDER BY source").fetchall()
+        return {
+            "path": self.path,
+            "questions": sum(count for _, count in sources),
+            "sources": dict(sources)
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QuestionStore()
+        return _store
+
+
+def query(source=None, **filters):
+    return get_store().query(source, **filters)
+
+
+def describe(summary):
+    if summary["first"]:
+        return f"✅ Loaded {summary['source']} ({summary['questions']} questions)"
+    counts = ", ".join(f"{len(summary[change])} {change}" for change in ("changed", "added", "removed"))
+    lines = [f"🔄 Reloaded {summary['source']}: {counts}"]
+    for change in ("changed", "added", "removed"):
+        if summary[change]:
+            lines.append(f"   {change}: {', '.join(summary[change])}")
+    return "\n".join(lines)
+
+
+def build_command(args):
+    store = QuestionStore(args.path)
+    start = time.perf_counter()
+    loaded = store.build(force=args.force)
+    for summary in loaded.values():
+        print(describe(summary))
+    s = store.stats()
+    print(f"{s['questions']} questions from {len(s['sources'])} sources in {s['path']} "
+          f"({len(loaded)} reloaded, {len(s['sources']) - len(loaded)} unchanged, {time.perf_counter() - start:.2f}s)")
+    store.close()
+    return 0
+
+
+def changes_command(args):
+    store = QuestionStore(args.path)
+    store.build()
+    print(json.dumps(store.changes(args.source), indent=2))
+    store.close()
+    return 0
+
+
+def info_command(args):
+    store = QuestionStore(args.path)
+    store.build()
+    s = store.stats()
+    print(json.dumps(s, indent=2))
+    for column in FIELDS:
+        print(f"\n{column}:")
+        for value, count in store.values(column).items():
+            print(f"  {value or '(none)'}: {count}")
+    store.close()
+    return 0
+
+
+def query_command(args):
+    store = QuestionStore(args.path)
+    filters = {column: getattr(args, column) for column in FIELDS}
+    if args.count:
+        print(store.count(args.source, **filters))
+    else:
+        for q in store.query(args.source, **filters):
+            print(json.dumps(q, ensure_ascii=False))
+    store.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.questions", description="Indexed question store")
+    parser.add_argument("--path", default=STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="reload every source dataset that changed since the last build")
+    build_parser.add_argument("--force", action="store_true", help="reload every source")
+    build_parser.set_defaults(func=build_command)
+
+    changes_parser = commands.add_parser("changes", help="question_ids the latest reload of each source changed")
+    changes_parser.add_argument("source", nargs="?", help="dataset file, relative to the repository root")
+    changes_parser.set_defaults(func=changes_command)
+
+    info_parser = commands.add_parser("info", help="question counts by source and indexed field")
+    info_parser.set_defaults(func=info_command)
+
+    query_parser = commands.add_parser("query", help="print matching questions as JSON lines")
+    query_parser.add_argument("--source", help="dataset file, relative to the repository root")
+    for column in FIELDS:
+        query_parser.add_argument(f"--{column.replace('_', '-')}", dest=column, nargs="+")
+    query_parser.add_argument("--count", action="store_true", help="only print how many questions match")
+    query_parser.set_defaults(func=query_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import threading
+
+from harness import client, grading, sections, trace
+from harness import store as result_store
+from harness.cache import model_name
+from harness.resilience import CallFailed
+
+# Set GMAT_REPAIR=off to keep unparseable answers as they are
+ENABLED = os.environ.get("GMAT_REPAIR", "on").lower() not in ("0", "off", "false", "no")
+# Model that reads the answer out of the original response; unset: ask the same model in the same conversation
+MODEL = os.environ.get("GMAT_REPAIR_MODEL") or None
+
+FOLLOW_UP = ("State only your final answer, in exactly the format the question asked for, "
+             "on a single line starting with \"Answer:\". Do not explain.")
+EXTRACT = """
+Below is a question followed by someone's answer to it. The answer does not state its
+final choice in the requested format.
+
+--- QUESTION ---
+{prompt}
+--- RESPONSE ---
+{response}
+--- END ---
+
+State only the final answer given in the response, in exactly the format the question
+asked for, on a single line starting with "Answer:". Do not explain.
+"""
+
+_calls = 0
+_fixed = 0
+_lock = threading.Lock()
+
+
+def count(fixed):
+    global _calls, _fixed
+    with _lock:
+        _calls += 1
+        if fixed:
+            _fixed += 1
+
+
+def summary():
+    return f"Repair calls: {_calls} ({_fixed} answers recovered)"
+
+
+# One short follow-up for a response whose answer could not be parsed. messages is
+# the original request when it was more than the prompt text (e.g. with images).
+def ask(prompt, response, model, messages=None):
+    if MODEL is None:
+        conversation = (messages or [{"role": "user", "content": prompt}]) + [
+            {"role": "assistant", "content": response},
+            {"role": "user", "content": FOLLOW_UP}
+        ]
+        return client.converse(conversation, model), model_name(model)
+    return client.chat(EXTRACT.format(prompt=prompt, response=response), MODEL), MODEL
+
+
+# The answer a response gives without asking again. The section's parse is
+# strict ("Answer: **C**" reads as "**C**"), so the grader's more lenient reading
+# is tried next; letter sections only accept a single A-E.
+def recover(section, response, predicted):
+    if section.letter_answers:
+        if len(predicted) == 1 and predicted in grading.LETTERS:
+            return predicted
+        return grading.extract_letter(response)
+    return predicted or grading.answer_text(response)
+
+
+# Returns (predicted, repair info) or (predicted, None) when no repair call was made.
+# The follow-up is only sent when neither parse finds an answer; a failed repair
+# call leaves the answer as parsed rather than failing the evaluation.
+def repair(section, prompt, response, model, predicted, messages=None):
+    if not ENABLED or not response:
+        return predicted, None
+    found = recover(section, response, predicted)
+    if found:
+        return found, None
+    try:
+        with trace.span("repair", model=model_name(model)):
+            follow_up, used = ask(prompt, response, model, messages)
+    except CallFailed as e:
+        count(False)
+        return predicted, {"model": model_name(model) if MODEL is None else MODEL, "error": str(e)}
+    fixed = recover(section, follow_up, section.parse_answer(follow_up))
+    count(bool(fixed))
+    return fixed or predicted, {"model": used, "response": follow_up}
+
+
+# Patch the rows of an existing results file whose answer could not be read;
+# returns (recovered, repair calls)
+def repair_results(results, section_name):
+    section = sections.get(section_name)
+    match = result_store.question_matcher(section_name)
+    recovered = 0
+    calls = 0
+    for r in results["questions"]:
+        q = match(r)
+        if r.get("error") or r.get("repair") or r.get("votes") is not None or r.get("batched") or not q:
+            continue
+        stored = r.get("predicted") or ""
+        predicted, info = repair(section, section.build_prompt(q), r.get("explanation", ""), r["model"], stored)
+        if info is not None:
+            calls += 1
+            r["repair"] = info
+        if predicted != stored:
+            recovered += 1
+            r["predicted"] = predicted
+            r["is_correct"] = section.grade(q, predicted)
+    grading.refresh_accuracy(results, section_name)
+    return recovered, calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.repair",
+                                     description="Ask for the final answer of stored results that have none")
+    parser.add_argument("files", nargs="*", help="result files (default: every section's results)")
+    parser.add_argument("--section", help="section the given files belong to")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.files:
+        files = [(args.section or result_store.section_for_file(path), path) for path in args.files]
+    else:
+        files = result_store.known_result_files()
+
+    for section_name, path in files:
+        if section_name is None:
+            print(f"⚠️ Could not tell which section {path} belongs to; skipped")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        recovered, calls = repair_results(results, section_name)
+        if recovered or calls:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+        print(f"{path}: {recovered} answers recovered, {calls} follow-up calls")
+    print(summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
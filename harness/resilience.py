@@ -0,0 +1,256 @@
+import contextvars
+import os
+import queue
+import random
+import threading
+import time
+
+from harness import trace
+
+# Defaults, per model
+REQUESTS_PER_MINUTE = float(os.environ.get("GMAT_REQUESTS_PER_MINUTE", 30))
+BURST = int(os.environ.get("GMAT_BURST", 5))
+CALL_TIMEOUT = float(os.environ.get("GMAT_CALL_TIMEOUT", 180))
+MAX_RETRIES = int(os.environ.get("GMAT_MAX_RETRIES", 3))
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+FAILURE_THRESHOLD = 5  # consecutive failures before the breaker opens
+COOLDOWN = 120.0       # seconds a tripped model is paused
+MAX_HUNG = int(os.environ.get("GMAT_MAX_HUNG_CALLS", 64))  # timed-out calls still blocking a thread
+IDLE_WORKER = 60.0     # seconds an idle call thread is kept
+
+
+class CallFailed(Exception):
+    def __init__(self, model, attempts, error):
+        super().__init__(f"{model} failed after {attempts} attempt(s): {error!r}")
+        self.model = model
+        self.attempts = attempts
+        self.error = error
+
+
+class CallTimeout(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute=REQUESTS_PER_MINUTE, burst=BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate == float("inf"):
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# closed: calls flow. open: the model is paused until the cooldown ends.
+# half-open: one probe call decides whether to close again or re-open.
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self.lock:
+                if self.opened_at is None:
+                    return
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining <= 0 and not self.probing:
+                    self.probing = True
+                    return
+            time.sleep(max(remaining, 0.5))
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.probing:
+                    print(f"⚠️  Circuit open: pausing for {self.cooldown:.0f}s after {self.failures} failures")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+# Timing of the attempt running in this context; see first_byte()
+_attempt = contextvars.ContextVar("gmat_attempt", default=None)
+
+_limiters = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+# Calls run on their own threads so a hung provider can be abandoned after
+# CALL_TIMEOUT. A call goes to an idle thread or a new one, never behind other
+# calls, so the timeout only runs while the call does. Abandoned calls keep their
+# thread until the provider returns; once MAX_HUNG of them are stuck, new calls
+# fail at once (and count towards the circuit breaker) instead of piling up more.
+class CallRunner:
+    def __init__(self, max_hung=MAX_HUNG, idle_timeout=IDLE_WORKER):
+        self.max_hung = max_hung
+        self.idle_timeout = idle_timeout
+        self.tasks = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.idle = 0
+        self.hung = 0
+        self.threads = 0
+
+    def worker(self):
+        while True:
+            try:
+                task = self.tasks.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self.lock:
+                    if self.idle > 0:
+                        # Not promised to a submitted call: retire
+                        self.idle -= 1
+                        self.threads -= 1
+                        return
+                continue
+            task["begun"].set()
+            try:
+                task["result"] = task["context"].run(task["fn"])
+            except BaseException as e:
+                task["error"] = e
+            with self.lock:
+                task["done"].set()
+                if task.get("abandoned"):
+                    self.hung -= 1
+                self.idle += 1
+
+    def run(self, fn, timeout):
+        task = {"fn": fn, "context": contextvars.copy_context(), "begun": threading.Event(),
+                "done": threading.Event()}
+        with self.lock:
+            if self.hung >= self.max_hung:
+                raise CallTimeout(f"{self.hung} timed-out calls still hold their threads")
+            if self.idle > 0:
+                self.idle -= 1
+            else:
+                self.threads += 1
+                threading.Thread(target=self.worker, name=f"provider-call-{self.threads}", daemon=True).start()
+        self.tasks.put(task)
+        task["begun"].wait()
+        if not task["done"].wait(timeout):
+            with self.lock:
+                if not task["done"].is_set():
+                    task["abandoned"] = True
+                    self.hung += 1
+            if task.get("abandoned"):
+                raise CallTimeout(f"no response after {timeout:.0f}s")
+        if "error" in task:
+            raise task["error"]
+        return task["result"]
+
+
+_runner = CallRunner()
+
+
+def limiter_for(key):
+    with _registry_lock:
+        if key not in _limiters:
+            _limiters[key] = TokenBucket(REQUESTS_PER_MINUTE, BURST)
+        return _limiters[key]
+
+
+def breaker_for(key):
+    with _registry_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(FAILURE_THRESHOLD, COOLDOWN)
+        return _breakers[key]
+
+
+def backoff(attempt):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# Providers that read the response as it arrives call this when its first byte
+# is in; for the others the time to first byte is the whole response time
+def first_byte():
+    timing = _attempt.get()
+    if timing is not None and "first_byte" not in timing:
+        timing["first_byte"] = time.perf_counter()
+
+
+def call_with_timeout(fn, timeout):
+    return _runner.run(fn, timeout)
+
+
+def timed(fn, timing):
+    timing["sent"] = time.perf_counter()
+    _attempt.set(timing)
+    with trace.span("request", "provider"):
+        return fn()
+
+
+# stats, when given, receives the attempts made, the total latency, the time to
+# first byte of the attempt that answered and the queue wait: every moment not
+# spent in a provider request (breaker, rate limiter, thread pool, backoff).
+def call(key, fn, retries=None, timeout=None, stats=None):
+    retries = MAX_RETRIES if retries is None else retries
+    timeout = CALL_TIMEOUT if timeout is None else timeout
+    limiter = limiter_for(key)
+    breaker = breaker_for(key)
+    error = None
+    begin = time.perf_counter()
+    requesting = 0.0
+    timing = {}
+
+    def measure(attempts):
+        if stats is not None:
+            end = time.perf_counter()
+            stats.update(attempts=attempts, latency=end - begin, queue_wait=end - begin - requesting)
+            if "sent" in timing:
+                stats["ttfb"] = timing.get("first_byte", end) - timing["sent"]
+
+    for attempt in range(retries + 1):
+        breaker.wait()
+        limiter.acquire()
+        timing = {}
+        try:
+            result = call_with_timeout(lambda: timed(fn, timing), timeout)
+        except Exception as e:
+            requesting += time.perf_counter() - timing.get("sent", time.perf_counter())
+            error = e
+            breaker.failure()
+            print(f"⚠️  {key} attempt {attempt + 1}/{retries + 1} failed: {e!r}")
+            if attempt < retries:
+                time.sleep(backoff(attempt))
+            continue
+        requesting += time.perf_counter() - timing["sent"]
+        if not result:
+            # Free providers sometimes answer 200 with an empty body; treat it as a failure
+            error = ValueError("empty response")
+            breaker.failure()
+            print(f"⚠️  {key} attempt {attempt + 1}/{retries + 1} returned an empty response")
+            if attempt < retries:
+                time.sleep(backoff(attempt))
+            continue
+        breaker.success()
+        measure(attempt + 1)
+        return result
+
+    measure(retries + 1)
+    raise CallFailed(key, retries + 1, error)
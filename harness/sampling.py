@@ -0,0 +1,151 @@
+import asyncio
+import math
+import random
+
+from harness import client, engine, metrics, repair
+
+# Defaults
+SEED = 0
+CONFIDENCE_Z = 1.96  # 95% intervals
+MIN_QUESTIONS = 20  # never stop a model on fewer answers than this
+STEP = 10  # questions added per model between checks
+
+
+def stratum(q):
+    return (q.get("subtype-type") or q.get("subtype") or "", q.get("difficulty") or "")
+
+
+# Shuffle within each (subtype, difficulty) stratum, then interleave the strata
+# so every prefix of the order holds them in roughly their full-set proportions.
+# The same seed gives the same order, so all models see the same questions.
+def stratified_order(questions, seed=SEED):
+    rng = random.Random(seed)
+    strata = {}
+    for i, q in enumerate(questions):
+        strata.setdefault(stratum(q), []).append(i)
+
+    keyed = []
+    for key in sorted(strata):
+        members = strata[key]
+        rng.shuffle(members)
+        offset = rng.random()
+        keyed.extend(((j + offset) / len(members), i) for j, i in enumerate(members))
+    return [i for _, i in sorted(keyed)]
+
+
+# Wilson score interval for correct out of total
+def interval(correct, total, z=CONFIDENCE_Z):
+    if not total:
+        return 0.0, 1.0
+    p = correct / total
+    denominator = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denominator
+    half = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+# Failed calls say nothing about the model, so they are left out of the estimate
+def estimate(records):
+    answered = [r for r in records if r is not None and not r.get("error")]
+    correct = sum(1 for r in answered if r["is_correct"])
+    low, high = interval(correct, len(answered))
+    return {
+        "evaluated": len(answered),
+        "accuracy": round(correct / len(answered) * 100, 2) if answered else 0,
+        "interval": [round(low * 100, 2), round(high * 100, 2)]
+    }
+
+
+# Sampled sweep. Questions are asked in stratified order, STEP at a time per
+# model and prompt style. With target_width (full width of the interval, as a
+# fraction) a model stops once its interval is that narrow; with budget only
+# the first budget questions of the order are asked (quick smoke run).
+# Returns {section name: results} like engine.run, plus a "sampling" block.
+def run(workload, models, prompt_styles, journals=None, target_width=None, budget=None, seed=SEED,
+        min_questions=MIN_QUESTIONS, step=STEP, max_concurrency=engine.MAX_CONCURRENCY,
+        per_model_concurrency=engine.PER_MODEL_CONCURRENCY, verbose=True):
+    journals = journals or {}
+
+    def on_record(section, record):
+        journal = journals.get(section.name)
+        if journal is not None:
+            journal.append(record)
+
+    all_results = {}
+    try:
+        for section, questions in workload:
+            section.reset()
+            selected = section.select(questions)
+            order = stratified_order(selected, seed)
+            if budget is not None:
+                order = order[:budget]
+            ordered = [selected[i] for i in order]
+            tasks = engine.plan(section, ordered, models, prompt_styles)
+            n, p = len(ordered), len(prompt_styles)
+
+            journal = journals.get(section.name)
+            if journal is None:
+                records = [None] * len(tasks)
+            else:
+                records = engine.from_journal(tasks, [r for r in journal.records if not r.get("error")])
+
+            def index(mi, pi, qi):
+                return (mi * p + pi) * n + qi
+
+            active = [(mi, pi) for mi in range(len(models)) for pi in range(p)]
+            stopped = {}
+            position = 0
+            while active and position < n:
+                end = n if target_width is None else min(n, max(position + step, min_questions))
+                todo = [index(mi, pi, qi) for mi, pi in active for qi in range(position, end)
+                        if records[index(mi, pi, qi)] is None]
+                done = asyncio.run(engine.evaluate_all([tasks[i] for i in todo], max_concurrency,
+                                                       per_model_concurrency, on_record=on_record, verbose=verbose))
+                for i, record in zip(todo, done):
+                    records[i] = record
+                position = end
+
+                if target_width is None:
+                    continue
+                for mi, pi in list(active):
+                    e = estimate(records[index(mi, pi, 0):index(mi, pi, position)])
+                    width = (e["interval"][1] - e["interval"][0]) / 100
+                    if e["evaluated"] >= min_questions and width <= target_width:
+                        active.remove((mi, pi))
+                        stopped[(mi, pi)] = position
+                        print(f"⏹️ {section.name}: {models[mi]} - {prompt_styles[pi]} stopped after {position} of {n} "
+                              f"questions at {e['accuracy']}% {e['interval']}")
+
+            # Back to dataset order for the results file
+            by_position = sorted(range(n), key=lambda qi: order[qi])
+            section_records = [records[index(mi, pi, qi)] for mi in range(len(models)) for pi in range(p)
+                               for qi in by_position]
+            results = engine.build_results(section, questions, section_records, models, prompt_styles)
+
+            sampling = {
+                "mode": "budget" if budget is not None else "adaptive",
+                "seed": seed,
+                "target_width": target_width,
+                "budget": budget,
+                "models": {}
+            }
+            for mi, model in enumerate(models):
+                sampling["models"][model] = {}
+                for pi, ps in enumerate(prompt_styles):
+                    e = estimate(records[index(mi, pi, 0):index(mi, pi, n)])
+                    e["stopped_early"] = (mi, pi) in stopped
+                    sampling["models"][model][ps] = e
+            results["sampling"] = sampling
+            evaluated = sum(1 for r in section_records if r is not None)
+            full = len(selected) * len(models) * p
+            print(f"📉 {section.name}: {evaluated} of {full} evaluations ({full - evaluated} calls saved)")
+            all_results[section.name] = results
+    finally:
+        for journal in journals.values():
+            journal.close()
+    if verbose:
+        print(client.summary())
+        print(repair.summary())
+        print(metrics.summary())
+    return all_results
+
@@ -0,0 +1,38 @@
+from harness import providers
+from harness.sections.base import SEARCH_STYLES, namespaced_path
+from harness.sections.data_insights import DataSufficiency, IntegratedReasoning
+from harness.sections.multimodal import DataSufficiencyImages, IntegratedReasoningImages, MultiSourceReasoningImages
+from harness.sections.quant import Algebra, AlgebraByModel, ProblemSolving
+from harness.sections.verbal import CriticalReasoning, ReadingComprehension, ReadingComprehensionBatched
+
+SECTIONS = {
+    section.name: section
+    for section in [ProblemSolving(), Algebra(), AlgebraByModel(), ReadingComprehension(),
+                    ReadingComprehensionBatched(), CriticalReasoning(),
+                    DataSufficiency(), IntegratedReasoning(),
+                    DataSufficiencyImages(), IntegratedReasoningImages(), MultiSourceReasoningImages()]
+}
+DEFAULT_SECTIONS = ["ps", "rc", "cr", "ds", "ir"]
+
+# A stand-in provider's runs (GMAT_PROVIDER=fake) keep their results and journals
+# apart, so they never replace real results or get resumed as real answers
+if providers.environment_namespace() is not None:
+    for section in SECTIONS.values():
+        section.output = namespaced_path(section.output, providers.environment_namespace())
+
+
+# Why a sweep of these sections and prompt styles cannot run, or None. Checked
+# before any call is made, so a sweep never stops partway over it.
+def unsupported_styles(names, prompt_styles):
+    styles = [ps for ps in prompt_styles if ps in SEARCH_STYLES]
+    text_only = [name for name in names if name in SECTIONS and not SECTIONS[name].search_styles]
+    if styles and text_only:
+        return (f"{', '.join(styles)} can only run on text sections; "
+                f"{', '.join(text_only)} send{'s' if len(text_only) == 1 else ''} images")
+    return None
+
+
+def get(name):
+    if name not in SECTIONS:
+        raise KeyError(f"Unknown section {name!r}; choose from {', '.join(SECTIONS)}")
+    return SECTIONS[name]
@@ -0,0 +1,144 @@
+import json
+import os
+
+from harness import client, consistency, questions, repair, tot, trace
+from harness.cache import prompt_hash
+
+
+# GMAT_DS_results.json -> GMAT_DS_results.fake.json, quant_results -> quant_results.fake
+def namespaced_path(path, namespace):
+    root, extension = os.path.splitext(path)
+    return f"{root}.{namespace}{extension}"
+
+
+# Prompt styles whose records hold more than one plain call's response
+SEARCH_STYLES = (consistency.STYLE, tot.STYLE)
+
+
+def parse_letter_answer(response):
+    answer_line = next((line for line in response.splitlines() if line.strip().startswith("Answer:")), "")
+    return answer_line.replace("Answer:", "").strip().upper()
+
+
+# A section owns one dataset: how to load it, how to prompt for a question,
+# how to read the answer back and where its results file lives. The engine
+# only talks to sections through these methods.
+class Section:
+    name = ""
+    title = ""
+    dataset = ""
+    output = ""
+    question_type = None  # key of the accuracy block; None for the per-subtype layout
+    subtypes = None
+    filters = {}  # question store filters applied to the dataset, e.g. {"subtype": "data sufficiency"}
+    letter_answers = True  # answers are one of A-E; False for sections graded on free-form answers
+    search_styles = True  # False: SEARCH_STYLES cannot be run, e.g. the request is more than the prompt text
+
+    # Subtype used by the per-subtype accuracy layout
+    def subtype(self, q):
+        return q.get("subtype", "")
+
+    def load(self):
+        with trace.span("load dataset", "data", section=self.name) as args:
+            loaded = list(questions.query(self.dataset, **self.filters))
+            if args is not None:
+                args["questions"] = len(loaded)
+        return loaded
+
+    # Questions to evaluate, in evaluation order
+    def select(self, questions):
+        return questions
+
+    def build_prompt(self, q):
+        raise NotImplementedError
+
+    # build_prompt, timed as its own stage
+    def render_prompt(self, q):
+        with trace.span("render prompt", section=self.name):
+            return self.build_prompt(q)
+
+    def parse_answer(self, response):
+        with trace.span("parse answer", section=self.name):
+            return self.parse(response)
+
+    def parse(self, response):
+        return parse_letter_answer(response)
+
+    def grade(self, q, predicted):
+        return predicted == q["correct_answer"].strip().upper()
+
+    def record(self, q, model, prompt_style, predicted, response):
+        return {
+            "question_id": q["question_id"],
+            "model": model,
+            "prompt_style": prompt_style,
+            "predicted": predicted,
+            "correct_answer": q["correct_answer"],
+            "is_correct": self.grade(q, predicted),
+            "explanation": response
+        }
+
+    # Called once at the start of every run, before any evaluation
+    def reset(self):
+        pass
+
+    # An event the engine waits for, outside its concurrency slots, before it evaluates q; None to go ahead
+    def ready(self, q, model, prompt_style):
+        return None
+
+    # prompt may be passed in when the caller already rendered it for another model
+    def evaluate(self, q, model, prompt_style, prompt=None):
+        if prompt is None:
+            prompt = self.render_prompt(q)
+        if prompt_style == consistency.STYLE:
+            return self.evaluate_by_vote(q, model, prompt_style, prompt)
+        if prompt_style == tot.STYLE:
+            return self.evaluate_by_search(q, model, prompt_style, prompt)
+        response = client.chat(prompt, model=model)
+        predicted, repaired = repair.repair(self, prompt, response, model, self.parse_answer(response))
+        record = self.record(q, model, prompt_style, predicted, response)
+        record["prompt_hash"] = prompt_hash(prompt)
+        if repaired is not None:
+            record["repair"] = repaired
+        return record
+
+    # Where a sampled (adaptive or budget) sweep is saved, so it never replaces the full results
+    def sample_path(self):
+        return self.output[:-len(".json")] + "_sample.json" if self.output.endswith(".json") else self.output + "_sample.json"
+
+    # Where a queue collect saves a section some of whose jobs are unfinished
+    def partial_path(self):
+        return namespaced_path(self.output, "partial")
+
+    # Self-consistency: the majority answer of several samples of the same prompt
+    def evaluate_by_vote(self, q, model, prompt_style, prompt):
+        predicted, response, votes, samples = consistency.vote(prompt, model, self.parse)
+        record = self.record(q, model, prompt_style, predicted, response)
+        record["votes"] = votes
+        record["samples"] = samples
+        return record
+
+    # Tree-of-thought search over the section prompt; the final answer is parsed as usual
+    def evaluate_by_search(self, q, model, prompt_style, prompt):
+        response, search = tot.solve(prompt, model)
+        record = self.record(q, model, prompt_style, self.parse_answer(response), response)
+        record["search"] = search
+        return record
+
+    # Partial results (and journal) of one shard of a sharded sweep
+    def shard_path(self, index, count, extension=".json"):
+        base = self.output[:-len(".json")] if self.output.endswith(".json") else self.output
+        return f"{base}.shard-{index}-of-{count}{extension}"
+
+    def journal_path(self):
+        return self.output[:-len(".json")] + ".jsonl" if self.output.endswith(".json") else self.output + ".jsonl"
+
+    def warm_cache(self, questions):
+        return client.warm_cache(self.output, questions, self.build_prompt, SEARCH_STYLES)
+
+    def save(self, results, path=None):
+        path = path or self.output
+        with trace.span("save results", "io", section=self.name, records=len(results.get("questions", []))):
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+        print(f"\n✅ {self.title} results saved to {path}")
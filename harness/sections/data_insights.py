@@ -0,0 +1,139 @@
+import json
+
+from harness import config, grading
+from harness.sections.base import Section
+
+
+def data_sufficiency_prompt(question_data):
+    question = question_data["question"]
+
+
+    prompt = f"""
+You are a GMAT expert.
+
+Your task is to evaluate a GMAT Data Sufficiency question using Tree of Thought reasoning.
+Carefully analyze the statements (1) and (2) and determine whether each is sufficient alone or in combination to answer the question.
+
+--- QUESTION START ---
+{question}
+--- QUESTION END ---
+
+Here are the standard Data Sufficiency answer options you must choose from:
+
+A: Statement (1) ALONE is sufficient, but statement (2) ALONE is not sufficient to answer the question asked.  
+B: Statement (2) ALONE is sufficient, but statement (1) ALONE is not sufficient to answer the question asked.  
+C: BOTH statements (1) and (2) TOGETHER are sufficient to answer the question asked, but NEITHER statement ALONE is sufficient to answer the question asked.  
+D: EACH statement ALONE is sufficient to answer the question asked.  
+E: Statements (1) and (2) TOGETHER are NOT sufficient to answer the question asked, and additional data specific to the problem are needed.
+
+Follow this reasoning process:
+
+Thought 1: What is the question asking?  
+Thought 2: Analyze Statement (1) alone. Is it sufficient?  
+Thought 3: Analyze Statement (2) alone. Is it sufficient?  
+Thought 4: Analyze them together. Are they sufficient jointly?  
+Thought 5: Choose the correct answer from options A to E.
+
+Format your response as:
+
+Answer: [A/B/C/D/E]  
+Explanation: [brief justification]
+"""
+    return prompt
+
+
+def integrated_reasoning_prompt(q):
+    subtype = q.get("subtype", "").lower()
+
+    base = f"""
+You are a GMAT Integrated Reasoning expert.
+
+Your task is to answer a question from the subtype: {subtype.title()}.
+Use Tree of Thought reasoning to carefully analyze the question and options.
+
+--- QUESTION START ---
+{q['question']}
+--- QUESTION END ---
+"""
+
+    if "table" in q:
+        base += f"\n--- TABLE DATA ---\n{json.dumps(q['table'], indent=2, ensure_ascii=False)}\n"
+
+    if "statements" in q:
+        base += f"\n--- STATEMENTS ---\n" + "\n".join([f"{i+1}. {s}" for i, s in enumerate(q["statements"])])
+
+    if "options" in q:
+        base += f"\n--- OPTIONS ---\n{json.dumps(q['options'], indent=2, ensure_ascii=False)}"
+
+    if "correct_answer" in q and isinstance(q["correct_answer"], dict):
+        base += "\nFormat your answer in this structure:\nAnswer: { field_name_1: value_1, field_name_2: value_2 }\n"
+    elif "correct_answer" in q and isinstance(q["correct_answer"], list):
+        base += "\nFormat your answer as a list:\nAnswer: [val1, val2, val3...]\n"
+    else:
+        base += "\nFormat your answer as:\nAnswer: [final choice]\n"
+
+    base += "\nExplain your reasoning step-by-step before selecting your final answer.\n"
+    return base
+
+
+def extract_predicted_answer(response):
+    for line in response.splitlines():
+        if line.strip().lower().startswith("answer:"):
+            return line.split(":", 1)[1].strip()
+    return ""
+
+
+class DataSufficiency(Section):
+    name = "ds"
+    title = "Data Sufficiency"
+    dataset = config.path("DataInsights", "DataSuffciency", "DSquestions", "DataSufficiency.json")
+    output = config.path("DataInsights", "DataSuffciency", "DSquestions", "GMAT_DS_results.json")
+    question_type = "data_sufficiency"
+    filters = {"section": "data insights", "subtype": "data sufficiency"}
+
+    def build_prompt(self, q):
+        return data_sufficiency_prompt(q)
+
+
+class IntegratedReasoning(Section):
+    name = "ir"
+    title = "Integrated Reasoning"
+    dataset = config.path("DataInsights", "IntergratedReasoning", "IRquestions", "IntegratedReasoning.json")
+    output = config.path("DataInsights", "IntergratedReasoning", "IRquestions", "GMAT_IR_results.json")
+    subtypes = ["Graphs and Tables", "Multi Source Reasoning", "Two Part Analysis"]
+    filters = {"section": "data insight"}
+    letter_answers = False
+
+    # Multi-source sets come with a passage the text prompt has no place for; they are asked from ir_msr_img
+    def load(self):
+        return [q for q in super().load() if "passage_index" not in q]
+
+    # Evaluate subtype by subtype
+    def select(self, questions):
+        return [q for st in self.subtypes for q in questions if q.get("subtype", "").lower() == st.lower()]
+
+    def build_prompt(self, q):
+        return integrated_reasoning_prompt(q)
+
+    def parse(self, response):
+        return extract_predicted_answer(response)
+
+    # Dict and list answers are compared field by field, not as their str() forms
+    def grade(self, q, predicted):
+        correct_answer = grading.expected_answer(q)
+        if correct_answer is None:
+            print(f"⚠️  Q{q['question_id']} is missing 'correct_answer'. Marking as incorrect.")
+            return False
+        return grading.matches(predicted, correct_answer)
+
+    def record(self, q, model, prompt_style, predicted, response):
+        return {
+            "question_id": q["question_id"],
+            "model": model,
+            "subtype": q.get("subtype", ""),
+            "prompt_style": prompt_style,
+            "predicted": predicted,
+            "correct_answer": q.get("correct_answer", None),
+            "is_correct": self.grade(q, predicted),
+            "explanation": response
+        }
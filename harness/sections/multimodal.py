@@ -0,0 +1,178 @@
+import os
+import threading
+
+from harness import client, config, consistency, grading, images, repair, tot, trace
+from harness.sections.base import Section
+from harness.sections.data_insights import data_sufficiency_prompt, integrated_reasoning_prompt
+
+# Defaults
+MAX_INFLIGHT_BYTES = int(os.environ.get("GMAT_IMAGE_INFLIGHT_MB", "48")) * 1024 * 1024  # image bytes in flight at once
+MAX_REQUEST_BYTES = int(os.environ.get("GMAT_IMAGE_REQUEST_MB", "16")) * 1024 * 1024  # image bytes in one request
+MIN_SIDE = 512  # oversized requests are re-encoded smaller, but never below this
+
+IN_IMAGE = "(The question is shown in the attached image{s}; read it from there.)"
+IN_SOURCES = ("(The source material is shown in the first attached image{s} and the question in the last one; "
+              "read them from there.)")
+
+
+# Counting semaphore over bytes: calls wait while the images already in flight
+# would push the total over the budget, so a few large screenshots run with less
+# concurrency than many small ones. A single payload larger than the budget runs alone.
+class ByteBudget:
+    def __init__(self, capacity=MAX_INFLIGHT_BYTES):
+        self.capacity = capacity
+        self.used = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, size):
+        size = min(size, self.capacity)
+        with self.condition:
+            self.condition.wait_for(lambda: self.used + size <= self.capacity)
+            self.used += size
+        return size
+
+    def release(self, size):
+        with self.condition:
+            self.used -= size
+            self.condition.notify_all()
+
+
+_budget = ByteBudget()
+
+
+# Vision sections send the question's screenshots with a text prompt. The
+# prompt reuses the text sections' wording; records follow the text sections'
+# schema so image and text accuracy can be compared directly.
+class ImageSection(Section):
+    search_styles = False
+
+    def build_prompt(self, q):
+        raise NotImplementedError
+
+    # Stands in for the question text in the text prompt
+    def image_text(self, q):
+        return IN_IMAGE.format(s="s" if len(images.image_paths(q)) > 1 else "")
+
+    # Image payloads for a question, re-encoded smaller until the request fits
+    def image_urls(self, q):
+        paths = images.image_paths(q)
+        cache = images.get_cache()
+        urls = [cache.data_url(p) for p in paths]
+        side = cache.max_side
+        while sum(len(u) for u in urls) > MAX_REQUEST_BYTES and side > MIN_SIDE:
+            side = max(MIN_SIDE, side // 2)
+            urls = [cache.data_url(p, side) for p in paths]
+        return urls
+
+    def messages(self, prompt, urls):
+        content = [{"type": "text", "text": prompt}]
+        content.extend({"type": "image_url", "image_url": {"url": url}} for url in urls)
+        return [{"role": "user", "content": content}]
+
+    def evaluate(self, q, model, prompt_style, prompt=None):
+        # Also refused up front by sections.unsupported_styles
+        if prompt_style in (consistency.STYLE, tot.STYLE):
+            raise ValueError(f"Prompt style {prompt_style!r} is text-only; {self.name} supports single-call styles")
+        if prompt is None:
+            prompt = self.render_prompt(q)
+        with trace.span("encode images", section=self.name):
+            urls = self.image_urls(q)
+        messages = self.messages(prompt, urls)
+
+        payload = sum(len(u) for u in urls)
+        held = _budget.acquire(payload)
+        try:
+            response = client.converse(messages, model)
+            predicted, repaired = repair.repair(self, prompt, response, model, self.parse_answer(response),
+                                               messages=messages)
+        finally:
+            _budget.release(held)
+
+        record = self.record(q, model, prompt_style, predicted, response)
+        record["images"] = len(urls)
+        record["payload_bytes"] = payload
+        if repaired is not None:
+            record["repair"] = repaired
+        return record
+
+    # Stored results are keyed by the text prompt alone, which never matches an image request
+    def warm_cache(self, questions):
+        return 0
+
+
+class DataSufficiencyImages(ImageSection):
+    name = "ds_img"
+    title = "Data Sufficiency (images)"
+    dataset = config.path("DataInsights", "DataSuffciency", "Imagedata", "DataSufficiencyImg.json")
+    output = config.path("DataInsights", "DataSuffciency", "Imagedata", "GMAT_DS_img_results.json")
+    question_type = "data_sufficiency"
+
+    def build_prompt(self, q):
+        return data_sufficiency_prompt({"question": self.image_text(q)})
+
+
+class IntegratedReasoningImages(ImageSection):
+    name = "ir_img"
+    title = "Integrated Reasoning (images)"
+    dataset = config.path("DataInsights", "IntergratedReasoning", "Imagedata", "IntergratedReasoningImg.json")
+    output = config.path("DataInsights", "IntergratedReasoning", "Imagedata", "GMAT_IR_img_results.json")
+    subtypes = ["Graphs", "Tables", "Two Part Analysis"]
+    letter_answers = False
+
+    def subtype(self, q):
+        return q.get("subtype-subtype", "")
+
+    def select(self, questions):
+        return [q for st in self.subtypes for q in questions if self.subtype(q).lower() == st.lower()]
+
+    # The text IR prompt, with the screenshots standing in for the question text
+    def build_prompt(self, q):
+        text_question = {
+            "subtype": self.subtype(q),
+            "question": self.image_text(q),
+            "correct_answer": q.get("correct_answer")
+        }
+        if q.get("options") is not None:
+            text_question["options"] = q["options"]
+        return integrated_reasoning_prompt(text_question)
+
+    def parse(self, response):
+        return grading.answer_text(response)
+
+    def grade(self, q, predicted):
+        return grading.matches(predicted, grading.expected_answer(q))
+
+    def record(self, q, model, prompt_style, predicted, response):
+        return {
+            "question_id": q["question_id"],
+            "model": model,
+            "subtype": self.subtype(q),
+            "prompt_style": prompt_style,
+            "predicted": predicted,
+            "correct_answer": q.get("correct_answer"),
+            "is_correct": self.grade(q, predicted),
+            "explanation": response
+        }
+
+
+# Multi-source reasoning: each question comes with its passage screenshots
+# (p*.png, from paragraph_id) followed by the question screenshot (q*.png)
+class MultiSourceReasoningImages(IntegratedReasoningImages):
+    name = "ir_msr_img"
+    title = "Integrated Reasoning Multi-Source (images)"
+    dataset = config.path("DataInsights", "IntergratedReasoning", "Imagedata", "IR_Multi_Source_ReasoningIMG.json")
+    output = config.path("DataInsights", "IntergratedReasoning", "Imagedata", "GMAT_IR_MSR_img_results.json")
+    subtypes = None
+    question_type = "multi_source_reasoning"
+
+    def select(self, questions):
+        return questions
+
+    def image_text(self, q):
+        passages = len(images.image_paths(q)) - 1
+        return IN_SOURCES.format(s="s" if passages > 1 else "")
+
+    def record(self, q, model, prompt_style, predicted, response):
+        record = super().record(q, model, prompt_style, predicted, response)
+        del record["subtype"]
+        return record
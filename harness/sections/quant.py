@@ -0,0 +1,176 @@
+import json
+import os
+
+from harness import client, config, engine
+from harness.sections.base import SEARCH_STYLES, Section
+
+
+# Define ToT prompts for each subtype-type
+def get_tot_prompt(q):
+    subtype = q.get("subtype-type", "").lower()
+    question = q["question"]
+    options = json.dumps(q["options"], indent=2, ensure_ascii=False)
+
+    if subtype == "algebra":
+        reasoning = """
+Thought 1: Identify the structure of the expression or equation.  
+Thought 2: Explore integer/real value constraints or factorizations.  
+Thought 3: Determine value ranges or count of solutions.  
+Thought 4: Match your answer to the given options.
+"""
+    elif subtype == "number properties":
+        reasoning = """
+Thought 1: Understand constraints given for divisibility, remainders or factor counts.  
+Thought 2: Use examples or algebra to validate multiple scenarios.  
+Thought 3: Use elimination to rule out impossible choices.  
+Thought 4: Select the most suitable answer.
+"""
+    elif subtype == "arithmetic":
+        reasoning = """
+Thought 1: Identify what operations are involved (sum, difference, etc.).  
+Thought 2: Use formulas or logical reasoning to simplify.  
+Thought 3: Estimate or directly calculate the result.  
+Thought 4: Choose the best-fitting option.
+"""
+    elif subtype == "combinatorics":
+        reasoning = """
+Thought 1: Understand what's being arranged or chosen.  
+Thought 2: Identify overcounts or duplicates (if any).  
+Thought 3: Use permutations or combinations appropriately.  
+Thought 4: Finalize your count and compare to options.
+"""
+    elif subtype == "word problem":
+        reasoning = """
+Thought 1: Parse the real-world scenario into a mathematical model.  
+Thought 2: Translate given quantities and changes into equations.  
+Thought 3: Calculate per-unit or total changes as needed.  
+Thought 4: Solve and round off (if required), then match to options.
+"""
+    else:
+        reasoning = """
+Thought 1: Understand the core mathematical question.  
+Thought 2: Consider all plausible solving paths.  
+Thought 3: Choose the fastest or most reliable method.  
+Thought 4: Solve and select the correct answer.
+"""
+
+    return f"""
+You are a GMAT Quant expert.
+
+Your task is to solve the following Problem Solving question using Tree of Thought reasoning.
+
+--- QUESTION START ---
+{question}
+--- QUESTION END ---
+
+Here are the options:
+{options}
+
+Follow this reasoning process:
+{reasoning}
+
+Format your response as:
+
+Answer: [A/B/C/D/E]  
+Explanation: [brief justification]
+"""
+
+
+def algebra_prompt(question_data):
+    question = question_data["question"]
+    options = question_data["options"]
+
+    prompt = f"""
+You are a GMAT Quant expert.
+
+Your task is to evaluate a Problem Solving (Algebra) question using Tree of Thought reasoning.
+Analyze the problem step by step, eliminate incorrect choices, and select the best answer.
+
+--- QUESTION START ---
+{question}
+--- QUESTION END ---
+
+Here are the options:
+{json.dumps(options, indent=2, ensure_ascii=False)}
+
+Follow this reasoning process:
+
+Thought 1: What kind of algebraic problem is this?
+Thought 2: What equation(s) or concept(s) can be applied?
+Thought 3: Perform the necessary calculations step-by-step.
+Thought 4: Eliminate options that don’t make sense.
+Thought 5: Choose the best answer.
+
+Format your response as:
+
+Answer: [A/B/C/D/E]  
+Explanation: [brief justification]
+"""
+    return prompt
+
+
+class ProblemSolving(Section):
+    name = "ps"
+    title = "Quant Problem Solving"
+    dataset = config.path("Quant", "ProblemSolving", "ProblemSolving.json")
+    output = config.path("Quant", "ProblemSolving", "GMAT_QUANT_results.json")
+    question_type = "problem_solving"
+
+    def build_prompt(self, q):
+        return get_tot_prompt(q)
+
+
+class Algebra(Section):
+    name = "ps_algebra"
+    title = "Quant Algebra"
+    dataset = config.path("Quant", "ProblemSolving", "quant_algebra.json")
+    output = config.path("Quant", "ProblemSolving", "GMAT_Quant_Algebra_results.json")
+    question_type = "algebra"
+
+    def build_prompt(self, q):
+        return algebra_prompt(q)
+
+
+# Same questions and prompt as Algebra, but results are written one file per
+# model under quant_results/, the way ToTquant.py always saved them.
+class AlgebraByModel(Algebra):
+    name = "ps_algebra_by_model"
+    title = "Quant Algebra (per model)"
+    output = config.path("Quant", "ProblemSolving", "quant_results")
+    section_name = "Quant_Algebra"
+
+    def model_path(self, model_name):
+        filename = f"GMAT_{self.section_name}_Results_{model_name.replace('.', '_').replace('-', '_')}.json"
+        return os.path.join(self.output, filename)
+
+    def journal_path(self):
+        return os.path.join(self.output, f"GMAT_{self.section_name}_journal.jsonl")
+
+    def warm_cache(self, questions):
+        if not os.path.isdir(self.output):
+            return 0
+        return sum(
+            client.warm_cache(os.path.join(self.output, name), questions, self.build_prompt, SEARCH_STYLES)
+            for name in sorted(os.listdir(self.output))
+            if name.startswith(f"GMAT_{self.section_name}_Results_") and name.endswith(".json")
+        )
+
+    def save(self, results, path=None):
+        if path is not None:
+            return super().save(results, path)
+        os.makedirs(self.output, exist_ok=True)
+        models = list(results["overall_accuracy"])
+        prompt_styles = list(next(iter(results["overall_accuracy"].values()), {}))
+        for model in models:
+            records = [r for r in results["questions"] if r["model"] == model]
+            accuracy, overall_accuracy = engine.aggregate(records, [model], prompt_styles, self.question_type)
+            model_results = {
+                "total_questions": results["total_questions"],
+                "questions": records,
+                "accuracy": accuracy,
+                "overall_accuracy": overall_accuracy
+            }
+            filepath = self.model_path(model)
+            with open(filepath, "w") as f:
+                json.dump(model_results, f, indent=2)
+            print(f"\n✅ Saved results for {model} to {filepath}")
@@ -0,0 +1,241 @@
+import json
+import re
+import threading
+
+from harness import client, config, trace
+from harness.resilience import CallFailed
+from harness.sections.base import SEARCH_STYLES, Section
+
+BATCH_ANSWER = re.compile(r"^[\s*#]*Q\s*(\d+)[\s*:.)-]*Answer[\s*]*:[\s*(]*([A-E])\b", re.IGNORECASE | re.MULTILINE)
+
+
+def reading_comprehension_prompt(question_data, passage):
+    question = question_data["question"]
+    options = question_data["options"]
+
+    prompt = f"""
+You are a GMAT Verbal Reasoning expert.
+
+Your task is to evaluate a Reading Comprehension question using Tree of Thought reasoning.
+Carefully read the passage and analyze the question using logical reasoning.
+
+--- PASSAGE START ---
+{passage}
+--- PASSAGE END ---
+
+--- QUESTION START ---
+{question}
+--- QUESTION END ---
+
+Here are the options:
+{json.dumps(options, indent=2, ensure_ascii=False)}
+
+Follow this reasoning process:
+
+Thought 1: What is the main topic of the passage?  
+Thought 2: What part(s) of the passage are relevant to this specific question?  
+Thought 3: What are the plausible answer choices based on the relevant lines?  
+Thought 4: Rule out incorrect options.  
+Thought 5: Choose the best option.
+
+Format your response as:
+
+Answer: [A/B/C/D/E]  
+Explanation: [brief justification]
+"""
+    return prompt
+
+
+def critical_reasoning_prompt(question_data):
+    question = question_data["question"]
+    options = question_data["options"]
+
+    prompt = f"""
+You are a GMAT Verbal Reasoning expert.
+
+Your task is to evaluate a Critical Reasoning question using Tree of Thought reasoning.
+Identify the argument's conclusion and premises before weighing the options.
+
+--- QUESTION START ---
+{question}
+--- QUESTION END ---
+
+Here are the options:
+{json.dumps(options, indent=2, ensure_ascii=False)}
+
+Follow this reasoning process:
+
+Thought 1: What is the conclusion of the argument, and what evidence supports it?  
+Thought 2: What assumption or gap connects the evidence to the conclusion?  
+Thought 3: What is the question asking you to do (strengthen, weaken, infer, explain...)?  
+Thought 4: Rule out options that are out of scope or work in the wrong direction.  
+Thought 5: Choose the best option.
+
+Format your response as:
+
+Answer: [A/B/C/D/E]  
+Explanation: [brief justification]
+"""
+    return prompt
+
+
+def batched_reading_comprehension_prompt(questions, passage):
+    blocks = "\n".join(
+        f"""--- QUESTION Q{q['question_id']} ---
+{q['question']}
+
+Options:
+{json.dumps(q['options'], indent=2, ensure_ascii=False)}
+"""
+        for q in questions
+    )
+    answer_lines = "\n".join(f"Q{q['question_id']} Answer: [A/B/C/D/E]" for q in questions)
+
+    prompt = f"""
+You are a GMAT Verbal Reasoning expert.
+
+Your task is to answer every Reading Comprehension question below using Tree of Thought reasoning.
+Carefully read the passage once, then analyze each question on its own.
+
+--- PASSAGE START ---
+{passage}
+--- PASSAGE END ---
+
+{blocks}
+For each question, follow this reasoning process:
+
+Thought 1: What is the main topic of the passage?  
+Thought 2: What part(s) of the passage are relevant to this specific question?  
+Thought 3: What are the plausible answer choices based on the relevant lines?  
+Thought 4: Rule out incorrect options.  
+Thought 5: Choose the best option.
+
+Finish your response with exactly one line per question, in this format:
+
+{answer_lines}
+"""
+    return prompt
+
+
+def parse_batched_answers(response):
+    return {qid: letter.upper() for qid, letter in BATCH_ANSWER.findall(response)}
+
+
+class ReadingComprehension(Section):
+    name = "rc"
+    title = "Reading Comprehension"
+    dataset = config.path("Verbal", "ReadingComprehension.json")
+    output = config.path("Verbal", "GMAT_RC_results.json")
+    question_type = "reading_comprehension"
+
+    # The store flattens passages: every question carries passage_text and passage_index.
+    # passage_id is not unique in the dataset, so passages are told apart by position.
+    def build_prompt(self, q):
+        return reading_comprehension_prompt(q, q["passage_text"])
+
+
+# Opt-in: one request per (passage, model, prompt style) asks every question of
+# the passage at once. The first question of a passage to be evaluated makes the
+# call; the engine holds the others back (see ready) until it answered, and they
+# reuse its answers. A question whose answer cannot be found in the batched
+# response falls back to its own call.
+class ReadingComprehensionBatched(ReadingComprehension):
+    name = "rc_batched"
+    title = "Reading Comprehension (batched per passage)"
+    output = config.path("Verbal", "GMAT_RC_batched_results.json")
+
+    def __init__(self):
+        self.passages = {}
+        self.prompts = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        questions = super().load()
+        with self.lock:
+            self.passages = {}
+            self.prompts = {}
+            for q in questions:
+                self.passages.setdefault(q["passage_index"], []).append(q)
+        return questions
+
+    # Batches of an earlier run in this process are never reused
+    def reset(self):
+        with self.lock:
+            self.batches = {}
+
+    # The prompt the engine renders for a question is its passage's batched prompt, built once
+    def build_prompt(self, q):
+        with self.lock:
+            prompt = self.prompts.get(q["passage_index"])
+            if prompt is None:
+                prompt = self.prompts[q["passage_index"]] = batched_reading_comprehension_prompt(
+                    self.passages[q["passage_index"]], q["passage_text"])
+        return prompt
+
+    # One question on its own, for the search styles and for answers the batch missed
+    def question_prompt(self, q):
+        with trace.span("render prompt", section=self.name):
+            return reading_comprehension_prompt(q, q["passage_text"])
+
+    def warm_cache(self, questions):
+        return client.warm_cache(self.output, questions, self.question_prompt, SEARCH_STYLES)
+
+    # Claims the batch of q's passage, or returns the event to wait on when another
+    # question already claimed it. The engine waits outside its concurrency slots.
+    def ready(self, q, model, prompt_style):
+        if prompt_style in SEARCH_STYLES:
+            return None
+        batch, owner = self.claim(q, model, prompt_style)
+        return None if owner else batch["done"]
+
+    def claim(self, q, model, prompt_style):
+        key = (q["passage_index"], str(model), prompt_style)
+        with self.lock:
+            batch = self.batches.get(key)
+            if batch is None:
+                batch = self.batches[key] = {"owner": str(q["question_id"]), "done": threading.Event(),
+                                             "answers": {}, "response": "", "error": None}
+        return batch, batch["owner"] == str(q["question_id"]) and not batch["done"].is_set()
+
+    def ask_passage(self, q, model, prompt_style, prompt=None):
+        batch, owner = self.claim(q, model, prompt_style)
+        if owner:
+            try:
+                if prompt is None:
+                    prompt = self.render_prompt(q)
+                batch["response"] = client.chat(prompt, model=model)
+                with trace.span("parse answer", section=self.name):
+                    batch["answers"] = parse_batched_answers(batch["response"])
+            except CallFailed as e:
+                batch["error"] = e
+            finally:
+                batch["done"].set()
+        else:
+            batch["done"].wait()
+        return batch
+
+    def evaluate(self, q, model, prompt_style, prompt=None):
+        if prompt_style in SEARCH_STYLES:
+            return super().evaluate(q, model, prompt_style, self.question_prompt(q))
+        batch = self.ask_passage(q, model, prompt_style, prompt)
+        if batch["error"] is not None:
+            raise batch["error"]
+        predicted = batch["answers"].get(str(q["question_id"]))
+        if not predicted:
+            return super().evaluate(q, model, prompt_style, self.question_prompt(q))
+
+        record = self.record(q, model, prompt_style, predicted, batch["response"])
+        record["batched"] = True
+        return record
+
+
+class CriticalReasoning(Section):
+    name = "cr"
+    title = "Critical Reasoning"
+    dataset = config.path("Verbal", "CriticalReasoning.json")
+    output = config.path("Verbal", "GMAT_CR_results.json")
+    question_type = "critical_reasoning"
+
+    def build_prompt(self, q):
+        return critical_reasoning_prompt(q)
@@ -0,0 +1,202 @@
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from harness import cli, config, engine, resilience, sections
+from harness.journal import record_key, task_key
+
+SHARD_FILE = re.compile(r"\.shard-(\d+)-of-(\d+)\.json$")
+LOG_DIR = config.path(".cache", "shards")
+
+
+# {shard count: {index: path}} of the partial results a section's shards saved
+def shard_files(section):
+    pattern = section.shard_path("*", "*")
+    found = {}
+    for path in glob.glob(glob.escape(pattern).replace(glob.escape("*"), "*")):
+        match = SHARD_FILE.search(path)
+        if match:
+            found.setdefault(int(match.group(2)), {})[int(match.group(1))] = path
+    return found
+
+
+# Combine one section's shards into the standard results layout. Records are put
+# in plan order (model -> prompt style -> question), so the merge does not depend
+# on which shard finished first. Returns (results, report); the report lists every
+# work item that is missing, duplicated, unknown to the plan or in the wrong shard.
+def merge(section, paths):
+    parts = {}
+    for index, path in sorted(paths.items()):
+        with open(path, "r", encoding="utf-8") as f:
+            parts[index] = json.load(f)
+
+    problems = []
+    for index, results in list(parts.items()):
+        if "shard" not in results:
+            problems.append(f"{paths[index]} has no shard block; it was not written by run --shard")
+            del parts[index]
+    if not parts:
+        return None, {"section": section.name, "shards": 0, "items": 0, "missing": [], "duplicate": [],
+                      "unexpected": [], "misplaced": [], "failed": 0, "problems": problems}
+    first = next(iter(parts.values()))["shard"]
+    count, models, prompt_styles = first["count"], first["models"], first["prompt_styles"]
+    for index, results in parts.items():
+        meta = results["shard"]
+        if (meta["index"], meta["count"]) != (index, count):
+            problems.append(f"{paths[index]} says it is shard {meta['index']}/{meta['count']}")
+        if (meta["models"], meta["prompt_styles"]) != (models, prompt_styles):
+            problems.append(f"{paths[index]} was run with other models or prompt styles")
+    absent = sorted(set(range(count)) - set(parts))
+    if absent:
+        problems.append(f"no results for shard{'s' if len(absent) > 1 else ''} {', '.join(map(str, absent))} of {count}")
+
+    questions = section.select(section.load())
+    tasks = engine.plan(section, questions, models, prompt_styles)
+    expected = Counter(task_key(model, ps, q["question_id"]) for _, model, ps, q in tasks)
+
+    found = Counter()
+    misplaced = []
+    records = []
+    for index, results in parts.items():
+        for r in results["questions"]:
+            key = record_key(r)
+            found[key] += 1
+            if engine.shard_of(*key, count) != index:
+                misplaced.append(key)
+            records.append(r)
+
+    report = {
+        "section": section.name,
+        "shards": count,
+        "items": len(tasks),
+        "missing": sorted((expected - found).elements()),
+        "duplicate": sorted(k for k in (found - expected).elements() if k in expected),
+        "unexpected": sorted(k for k in found if k not in expected),
+        "misplaced": sorted(misplaced),
+        "failed": sum(1 for r in records if r.get("error")),
+        "problems": problems
+    }
+    # A duplicated item keeps its first successful record, in shard order
+    merged = engine.from_journal(tasks, records)
+    return engine.build_results(section, questions, merged, models, prompt_styles), report
+
+
+def clean(report):
+    return not any(report[k] for k in ("missing", "duplicate", "unexpected", "misplaced", "problems"))
+
+
+def print_report(report):
+    if clean(report):
+        print(f"✅ {report['section']}: {report['items']} evaluations from {report['shards']} shards"
+              + (f" ({report['failed']} failed calls)" if report["failed"] else ""))
+        return
+    print(f"❌ {report['section']}: {report['shards']} shards, {report['items']} evaluations planned")
+    for problem in report["problems"]:
+        print(f"   {problem}")
+    for kind in ("missing", "duplicate", "unexpected", "misplaced"):
+        items = report[kind]
+        if items:
+            shown = ", ".join(f"Q{qid} {model}/{ps}" for model, ps, qid in items[:10])
+            print(f"   {len(items)} {kind}: {shown}{' ...' if len(items) > 10 else ''}")
+
+
+# Returns 0 when every section merged cleanly
+def merge_sections(names, count=None, force=False):
+    status = 0
+    for name in names:
+        section = sections.get(name)
+        found = shard_files(section)
+        if count is not None:
+            found = {count: found[count]} if count in found else {}
+        if not found:
+            print(f"❌ {name}: no shard results next to {section.output}")
+            status = 1
+            continue
+        if len(found) > 1:
+            print(f"❌ {name}: shard results for {', '.join(map(str, sorted(found)))} shards; pick one with --count")
+            status = 1
+            continue
+        results, report = merge(section, next(iter(found.values())))
+        print_report(report)
+        if results is not None and (clean(report) or force):
+            section.save(results)
+        else:
+            print("   Not saved; rerun the affected shards with --resume, or --force to save what is there")
+        if not clean(report):
+            status = 1
+    return status
+
+
+def merge_command(args):
+    names = args.sections or [name for name, section in sections.SECTIONS.items() if shard_files(section)]
+    if not names:
+        print("❌ No shard results found")
+        return 1
+    return merge_sections(names, args.count, args.force)
+
+
+# Run every shard as a local worker process, then merge. The request rate is
+# split between the workers, since they share the same provider accounts.
+def launch_command(args):
+    run_args = args.run_args[1:] if args.run_args[:1] == ["--"] else args.run_args
+    run_parser = argparse.ArgumentParser(prog="python -m harness run")
+    cli.add_run_arguments(run_parser)
+    options = run_parser.parse_args(run_args)
+    cli.check_run_arguments(run_parser, options)
+    if options.shard is not None:
+        print("❌ launch assigns the shards itself; drop --shard")
+        return 2
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    env = dict(os.environ, GMAT_REQUESTS_PER_MINUTE=str(resilience.REQUESTS_PER_MINUTE / args.shards))
+    workers = []
+    start = time.perf_counter()
+    for index in range(args.shards):
+        log_path = os.path.join(LOG_DIR, f"shard-{index}-of-{args.shards}.log")
+        log = open(log_path, "w")
+        command = [sys.executable, "-m", "harness", "run", *run_args, "--shard", f"{index}/{args.shards}"]
+        workers.append((index, subprocess.Popen(command, cwd=config.ROOT, env=env, stdout=log,
+                                                stderr=subprocess.STDOUT), log, log_path))
+        print(f"⏳ Shard {index}/{args.shards} started (log: {log_path})")
+
+    failed = []
+    for index, worker, log, log_path in workers:
+        code = worker.wait()
+        log.close()
+        if code != 0:
+            failed.append(index)
+            print(f"❌ Shard {index}/{args.shards} exited with {code}; see {log_path}")
+    print(f"{args.shards - len(failed)} of {args.shards} shards finished in {time.perf_counter() - start:.1f}s")
+    if failed:
+        return 1
+    return merge_sections(options.sections, args.shards)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.shard",
+                                     description="Split a sweep across processes or hosts and merge the shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge_parser = commands.add_parser("merge", help="combine shard results into each section's results file")
+    merge_parser.add_argument("--sections", nargs="+", help="sections to merge (default: every section with shards)")
+    merge_parser.add_argument("--count", type=int, help="shard count to merge when several sweeps left shards")
+    merge_parser.add_argument("--force", action="store_true", help="save even with missing or duplicate items")
+    merge_parser.set_defaults(func=merge_command)
+
+    launch_parser = commands.add_parser("launch", help="run N local shard workers, then merge")
+    launch_parser.add_argument("--shards", type=int, required=True)
+    launch_parser.add_argument("run_args", nargs=argparse.REMAINDER, help="arguments for python -m harness run")
+    launch_parser.set_defaults(func=launch_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
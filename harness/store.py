@@ -0,0 +1,318 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import zlib
+
+import numpy as np
+
+from harness import config, sections
+
+# Defaults
+STORE_PATH = config.path("results", "results.npz")
+COMPRESS_LEVEL = 6
+
+# Scalar columns and their dtypes. String columns are dictionary encoded:
+# the column holds codes into a list of distinct values kept in the header.
+STRING_COLUMNS = ["section", "model", "prompt_style", "subtype", "difficulty", "predicted", "correct_answer", "error"]
+CODE_DTYPE = np.uint32
+NUMERIC_COLUMNS = {
+    "question_id": np.int64,
+    "is_correct": np.bool_,
+    "failed": np.bool_,
+    "latency": np.float32,  # seconds; NaN when the record has none
+    "explanation_offset": np.int64,
+    "explanation_length": np.int64,
+}
+
+
+def blob_path(path):
+    return os.path.splitext(path)[0] + ".blobs"
+
+
+# Older result files stored booleans as "True"/"False"
+def as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+# correct_answer is a letter for most sections but a dict or list for some IR questions
+def as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+# Append-only file of zlib-compressed texts. Identical texts are written once;
+# a text is addressed by (offset, length) of its compressed bytes.
+class BlobWriter:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "wb")
+        self.offset = 0
+        self.seen = {}
+
+    def put(self, text):
+        if not text:
+            return -1, 0
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        if digest not in self.seen:
+            data = zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+            self.f.write(data)
+            self.seen[digest] = (self.offset, len(data))
+            self.offset += len(data)
+        return self.seen[digest]
+
+    def close(self):
+        self.f.close()
+
+
+class BlobReader:
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        size = os.fstat(self.f.fileno()).st_size
+        self.data = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def get(self, offset, length):
+        if offset < 0:
+            return ""
+        return zlib.decompress(self.data[offset:offset + length]).decode("utf-8")
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.f.close()
+
+
+# Column arrays and the distinct values of each string column. Explanations go
+# to blobs when given and are dropped otherwise.
+def encode(rows, blobs=None):
+    values = {name: {} for name in STRING_COLUMNS}
+    columns = {name: [] for name in STRING_COLUMNS}
+    numeric = {name: [] for name in NUMERIC_COLUMNS}
+    for row in rows:
+        for name in STRING_COLUMNS:
+            text = row.get(name) or ""
+            columns[name].append(values[name].setdefault(text, len(values[name])))
+        offset, length = blobs.put(row.get("explanation") or "") if blobs is not None else (-1, 0)
+        latency = row.get("latency")
+        numeric["question_id"].append(row["question_id"])
+        numeric["is_correct"].append(row["is_correct"])
+        numeric["failed"].append(bool(row.get("error")))
+        numeric["latency"].append(float("nan") if latency is None else latency)
+        numeric["explanation_offset"].append(offset)
+        numeric["explanation_length"].append(length)
+
+    arrays = {name: np.asarray(columns[name], dtype=CODE_DTYPE) for name in STRING_COLUMNS}
+    arrays.update({name: np.asarray(numeric[name], dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()})
+    return arrays, {name: list(values[name]) for name in STRING_COLUMNS}
+
+
+def write(path, rows):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    blobs = BlobWriter(blob_path(path))
+    try:
+        arrays, values = encode(rows, blobs)
+    finally:
+        blobs.close()
+
+    header = {
+        "version": 1,
+        "blobs": os.path.basename(blob_path(path)),
+        "values": values,
+    }
+    arrays["header"] = np.frombuffer(json.dumps(header, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    return len(arrays["question_id"])
+
+
+# Read side: columns stay as numpy arrays; string columns are codes plus
+# .values[name], and decode(name) expands them when the strings are needed.
+class ResultStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        with np.load(path) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            self.columns = {name: data[name] for name in data.files if name != "header"}
+        self.values = {name: np.asarray(v, dtype=object) for name, v in header["values"].items()}
+        self.blobs = BlobReader(os.path.join(os.path.dirname(os.path.abspath(path)), header["blobs"]))
+
+    # A store held only in memory, without explanations
+    @classmethod
+    def from_rows(cls, rows):
+        store = cls.__new__(cls)
+        store.path = None
+        store.columns, values = encode(rows)
+        store.values = {name: np.asarray(v, dtype=object) for name, v in values.items()}
+        store.blobs = None
+        return store
+
+    def __len__(self):
+        return len(self.columns["question_id"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decode(self, name):
+        return self.values[name][self.columns[name]]
+
+    def code(self, name, value):
+        matches = np.flatnonzero(self.values[name] == value)
+        return int(matches[0]) if len(matches) else -1
+
+    def explanation(self, i):
+        if self.blobs is None:
+            return ""
+        return self.blobs.get(int(self.columns["explanation_offset"][i]), int(self.columns["explanation_length"][i]))
+
+    def row(self, i):
+        row = {name: self.values[name][self.columns[name][i]] for name in STRING_COLUMNS}
+        row["question_id"] = int(self.columns["question_id"][i])
+        row["is_correct"] = bool(self.columns["is_correct"][i])
+        latency = float(self.columns["latency"][i])
+        row["latency"] = None if np.isnan(latency) else latency
+        row["explanation"] = self.explanation(i)
+        return row
+
+    def close(self):
+        if self.blobs is not None:
+            self.blobs.close()
+
+
+# Result files the harness writes, as (section name, path)
+def known_result_files():
+    found = []
+    for name, section in sections.SECTIONS.items():
+        if os.path.isdir(section.output):
+            found.extend((name, os.path.join(section.output, f)) for f in sorted(os.listdir(section.output))
+                         if f.endswith(".json"))
+        elif os.path.exists(section.output):
+            found.append((name, section.output))
+    return found
+
+
+def section_for_file(path):
+    for name, known in known_result_files():
+        if os.path.abspath(known) == os.path.abspath(path):
+            return name
+    return None
+
+
+# subtype/difficulty are not in the result files, so they are looked up in the
+# section's dataset. Some datasets store question_id as a string, so ids are compared as strings.
+def question_lookup(section_name):
+    section = sections.get(section_name)
+    try:
+        questions = section.select(section.load())
+    except (OSError, ValueError, KeyError):
+        return {}
+    by_id = {}
+    for q in questions:
+        by_id.setdefault(str(q.get("question_id")), []).append(q)
+    return by_id
+
+
+# Returns match(record) -> question (or {}). Duplicate question_ids are matched
+# occurrence by occurrence in evaluation order, the same way the journal is.
+def question_matcher(section_name):
+    lookup = question_lookup(section_name) if section_name else {}
+    seen = {}
+
+    def match(r):
+        key = (r.get("model"), r.get("prompt_style"), str(r.get("question_id")))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        candidates = lookup.get(str(r.get("question_id")), [])
+        return candidates[min(occurrence, len(candidates) - 1)] if candidates else {}
+
+    return match
+
+
+def rows_from_results(path, section_name):
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    records = results["questions"] if isinstance(results, dict) else results
+    match = question_matcher(section_name)
+    for r in records:
+        q = match(r)
+        yield {
+            "section": section_name or "",
+            "question_id": r["question_id"],
+            "model": r.get("model", ""),
+            "prompt_style": r.get("prompt_style", ""),
+            "subtype": r.get("subtype") or q.get("subtype-type") or q.get("subtype") or "",
+            "difficulty": q.get("difficulty") or "",
+            "predicted": as_text(r.get("predicted")),
+            "correct_answer": as_text(r.get("correct_answer", q.get("correct_answer"))),
+            "is_correct": as_bool(r.get("is_correct")),
+            "error": r.get("error") or "",
+            "latency": r.get("latency"),
+            "explanation": r.get("explanation") or "",
+        }
+
+
+def rows_from_files(files):
+    for section_name, path in files:
+        yield from rows_from_results(path, section_name)
+
+
+def convert(files, out=STORE_PATH):
+    return write(out, rows_from_files(files))
+
+
+def convert_command(args):
+    if args.files:
+        files = [(args.section or section_for_file(path), path) for path in args.files]
+    else:
+        files = known_result_files()
+    for section_name, path in files:
+        if section_name is None:
+            print(f"⚠️ Could not tell which section {path} belongs to; subtype and difficulty will be empty")
+    rows = convert(files, args.out)
+
+    size = sum(os.path.getsize(p) for _, p in files)
+    stored = os.path.getsize(args.out) + os.path.getsize(blob_path(args.out))
+    print(f"✅ {rows} rows from {len(files)} result files written to {args.out}")
+    print(f"   {size / 1e6:.2f} MB of JSON -> {stored / 1e6:.2f} MB "
+          f"({os.path.getsize(args.out) / 1e3:.1f} KB columns + {os.path.getsize(blob_path(args.out)) / 1e6:.2f} MB blobs)")
+    return 0
+
+
+def info_command(args):
+    store = ResultStore(args.path)
+    try:
+        print(f"{store.path}: {len(store)} rows")
+        for name in STRING_COLUMNS:
+            print(f"  {name}: {len(store.values[name])} distinct values")
+        print(f"  correct: {int(store['is_correct'].sum())}, failed: {int(store['failed'].sum())}")
+    finally:
+        store.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.store", description="Columnar results store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="convert result JSON files into a store")
+    convert_parser.add_argument("files", nargs="*", help="result files (default: every section's results)")
+    convert_parser.add_argument("--section", help="section the given files belong to")
+    convert_parser.add_argument("--out", default=STORE_PATH)
+    convert_parser.set_defaults(func=convert_command)
+
+    info_parser = commands.add_parser("info", help="summarise a store")
+    info_parser.add_argument("path", nargs="?", default=STORE_PATH)
+    info_parser.set_defaults(func=info_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from harness import client, metrics
+from harness.cache import model_name
+from harness.resilience import CallFailed
+
+# Defaults
+STYLE = "tot_search"
+BREADTH = int(os.environ.get("GMAT_TOT_BREADTH", "3"))  # candidate thoughts per state
+BEAM = int(os.environ.get("GMAT_TOT_BEAM", "2"))  # states kept after each step
+DEPTH = int(os.environ.get("GMAT_TOT_DEPTH", "3"))  # thoughts before the final answer
+MAX_CALLS = int(os.environ.get("GMAT_TOT_MAX_CALLS", "32"))  # per question, final answer included
+
+SCORE = re.compile(r"Score:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+# Expansions and scoring run here, outside the engine's slots; the per-model rate limiter still applies
+_executor = ThreadPoolExecutor(max_workers=64)
+
+
+def render_thoughts(thoughts):
+    if not thoughts:
+        return "(none yet)"
+    return "\n".join(f"Thought {i}: {t}" for i, t in enumerate(thoughts, 1))
+
+
+def expand_prompt(problem, thoughts):
+    return f"""
+Here is a GMAT problem together with its answering instructions:
+
+{problem}
+
+Reasoning so far:
+{render_thoughts(thoughts)}
+
+Write only the next single step of reasoning (one thought, a few sentences).
+Do not give the final answer yet.
+"""
+
+
+def value_prompt(problem, thoughts):
+    return f"""
+Here is a GMAT problem together with its answering instructions:
+
+{problem}
+
+Partial reasoning:
+{render_thoughts(thoughts)}
+
+Judge whether this reasoning is correct so far and likely to lead to the right answer.
+Reply with a short justification and end with a line of the form:
+Score: <1-10>
+"""
+
+
+def answer_prompt(problem, thoughts):
+    return f"""
+Here is a GMAT problem together with its answering instructions:
+
+{problem}
+
+Reasoning:
+{render_thoughts(thoughts)}
+
+Using this reasoning, give the final answer in exactly the format the instructions ask for.
+"""
+
+
+def parse_score(response):
+    match = SCORE.search(response)
+    if match:
+        return float(match.group(1))
+    numbers = NUMBER.findall(response)
+    return float(numbers[-1]) if numbers else 0.0
+
+
+# One search per question: budgeted calls, memoized states
+class Search:
+    def __init__(self, problem, model, breadth=BREADTH, beam=BEAM, depth=DEPTH, max_calls=MAX_CALLS):
+        self.problem = problem
+        self.model = model
+        self.breadth = breadth
+        self.beam = beam
+        self.depth = depth
+        self.max_calls = max_calls
+        self.calls = 0
+        self.memo_hits = 0
+        self.values = {}
+        self.lock = threading.Lock()
+
+    # Reserve a call; False once only `keep` calls are left in the budget
+    def spend(self, keep=0):
+        with self.lock:
+            if self.calls >= self.max_calls - keep:
+                return False
+            self.calls += 1
+            return True
+
+    def ask(self, prompt, sample=None):
+        return client.chat(prompt, model=self.model, sample=sample)
+
+    def propose(self, thoughts, k):
+        try:
+            return self.ask(expand_prompt(self.problem, thoughts), sample=k).strip()
+        except CallFailed:
+            return ""
+
+    def value(self, thoughts):
+        try:
+            return parse_score(self.ask(value_prompt(self.problem, thoughts)))
+        except CallFailed:
+            return 0.0
+
+    # Candidate children of every state in the frontier, expanded concurrently.
+    # Children that repeat a state already seen are dropped.
+    def expand(self, frontier):
+        jobs = []
+        for state in frontier:
+            for k in range(self.breadth):
+                # One call is always kept back for the final answer
+                if not self.spend(keep=1):
+                    break
+                jobs.append((state, metrics.submit(_executor, self.propose, list(state), k)))
+
+        children = []
+        seen = set()
+        for state, future in jobs:
+            thought = future.result()
+            if not thought:
+                continue
+            child = state + (" ".join(thought.split()),)
+            if child in seen or child in self.values:
+                self.memo_hits += 1
+                continue
+            seen.add(child)
+            children.append(child)
+        return children
+
+    def score(self, states):
+        jobs = []
+        for state in states:
+            if state in self.values:
+                self.memo_hits += 1
+                continue
+            if not self.spend(keep=1):
+                break
+            jobs.append((state, metrics.submit(_executor, self.value, list(state))))
+        for state, future in jobs:
+            self.values[state] = future.result()
+        # States the budget left unscored rank last
+        return sorted(states, key=lambda s: -self.values.get(s, -1.0))
+
+    # Breadth-first beam search; returns (best path, its score, depth reached)
+    def run(self):
+        frontier = [()]
+        best = ()
+        for _ in range(self.depth):
+            children = self.expand(frontier)
+            if not children:
+                break
+            frontier = self.score(children)[:self.beam]
+            best = frontier[0]
+        return best, self.values.get(best), len(best)
+
+    def answer(self, thoughts):
+        if not self.spend():
+            raise CallFailed(model_name(self.model), 0, "tree-of-thought call budget spent before the final answer")
+        return self.ask(answer_prompt(self.problem, list(thoughts)))
+
+
+# Returns (final response, search summary for the record)
+def solve(problem, model):
+    search = Search(problem, model)
+    path, score, depth = search.run()
+    response = search.answer(path)
+    return response, {
+        "path": list(path),
+        "score": score,
+        "depth": depth,
+        "calls": search.calls,
+        "memo_hits": search.memo_hits,
+        "breadth": search.breadth,
+        "beam": search.beam
+    }
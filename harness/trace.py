@@ -0,0 +1,210 @@
+import argparse
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Defaults
+SAMPLE_INTERVAL = float(os.environ.get("GMAT_PROFILE_INTERVAL_MS", 5)) / 1000.0  # sampling profiler period
+PROFILES = ["cprofile", "sample"]
+
+# Nothing is recorded until start(); span() is then a shared no-op context
+_NULL = nullcontext()
+_events = None
+_lock = threading.Lock()
+_origin = 0
+_path = None
+_threads = set()
+_profiler = None
+_sampler = None
+
+
+def now_us():
+    return (time.perf_counter_ns() - _origin) // 1000
+
+
+def enabled():
+    return _events is not None
+
+
+def add_event(event):
+    tid = threading.get_ident()
+    with _lock:
+        if _events is None:
+            return
+        if tid not in _threads:
+            _threads.add(tid)
+            _events.append({"ph": "M", "name": "thread_name", "pid": os.getpid(), "tid": tid,
+                            "args": {"name": threading.current_thread().name}})
+        _events.append(dict(event, pid=os.getpid(), tid=tid))
+
+
+@contextmanager
+def _span(name, category, args):
+    start = now_us()
+    try:
+        yield args
+    finally:
+        add_event({"ph": "X", "name": name, "cat": category, "ts": start, "dur": now_us() - start, "args": args})
+
+
+# Times a stage of the pipeline as a complete event on the calling thread. The
+# yielded dict can take more args (e.g. sizes known only at the end).
+def span(name, category="harness", **args):
+    if _events is None:
+        return _NULL
+    return _span(name, category, args)
+
+
+def traced(name, category="harness"):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _events is None:
+                return fn(*args, **kwargs)
+            with _span(name, category, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Samples every thread's stack at a fixed interval. Stacks are kept as Chrome
+# trace stack frames and as collapsed stacks for flame graph tools.
+class Sampler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.frames = {}   # (parent id, name) -> id
+        self.samples = []
+        self.folded = {}
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name="trace-sampler", daemon=True)
+
+    def frame_id(self, parent, name):
+        key = (parent, name)
+        if key not in self.frames:
+            self.frames[key] = len(self.frames) + 1
+        return self.frames[key]
+
+    def loop(self):
+        own = threading.get_ident()
+        while not self.stopping.wait(self.interval):
+            ts = now_us()
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                names.reverse()
+                parent = None
+                for name in names:
+                    parent = self.frame_id(parent, name)
+                self.samples.append({"cpu": 0, "tid": tid, "ts": ts, "name": "sample", "sf": parent, "weight": 1})
+                folded = ";".join(names)
+                self.folded[folded] = self.folded.get(folded, 0) + 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+
+    def stack_frames(self):
+        return {str(i): dict({"name": name}, **({"parent": str(parent)} if parent else {}))
+                for (parent, name), i in self.frames.items()}
+
+
+# Starts recording spans to path (Chrome trace JSON). profile="cprofile"
+# profiles the main thread (loading, scheduling, aggregation, saving);
+# profile="sample" samples every thread, prompt rendering and parsing included.
+def start(path, profile=None, interval=SAMPLE_INTERVAL):
+    global _events, _origin, _path, _profiler, _sampler
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Unknown profiler {profile!r}; choose from {', '.join(PROFILES)}")
+    with _lock:
+        _origin = time.perf_counter_ns()
+        _path = path
+        _threads.clear()
+        _events = [{"ph": "M", "name": "process_name", "pid": os.getpid(), "args": {"name": "gmat harness"}}]
+    if profile == "cprofile":
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    elif profile == "sample":
+        _sampler = Sampler(interval)
+        _sampler.start()
+
+
+# Writes the trace, and the profile next to it (.folded stacks or .pstats); returns the paths written
+def stop():
+    global _events, _profiler, _sampler
+    with _lock:
+        events, _events = _events, None
+    if events is None:
+        return []
+    written = []
+    base = os.path.splitext(_path)[0]
+    os.makedirs(os.path.dirname(_path) or ".", exist_ok=True)
+    trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+    if _sampler is not None:
+        _sampler.stop()
+        trace["stackFrames"] = _sampler.stack_frames()
+        trace["samples"] = _sampler.samples
+        folded_path = base + ".folded"
+        with open(folded_path, "w") as f:
+            for stack, count in sorted(_sampler.folded.items()):
+                f.write(f"{stack} {count}\n")
+        written.append(folded_path)
+        _sampler = None
+    with open(_path, "w") as f:
+        json.dump(trace, f)
+    written.insert(0, _path)
+    if _profiler is not None:
+        _profiler.disable()
+        stats_path = base + ".pstats"
+        _profiler.dump_stats(stats_path)
+        written.append(stats_path)
+        _profiler = None
+    return written
+
+
+# Wall time per span name, busiest first: where harness time went
+def stage_totals(events):
+    totals = {}
+    for event in events:
+        if event.get("ph") == "X":
+            total = totals.setdefault((event.get("cat", ""), event["name"]), [0, 0])
+            total[0] += 1
+            total[1] += event["dur"]
+    return sorted(totals.items(), key=lambda item: -item[1][1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.trace", description="Summarize a trace or profile")
+    parser.add_argument("path", help="trace JSON written by run --trace, or the .pstats profile next to it")
+    parser.add_argument("--limit", type=int, default=25)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.path.endswith(".pstats"):
+        out = io.StringIO()
+        pstats.Stats(args.path, stream=out).sort_stats("cumulative").print_stats(args.limit)
+        print(out.getvalue())
+        return 0
+    with open(args.path, "r", encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    print(f"{'category':<10} {'span':<24} {'count':>8} {'total':>10} {'mean':>10}")
+    for (category, name), (count, dur) in stage_totals(events)[:args.limit]:
+        print(f"{category:<10} {name:<24} {count:>8} {dur / 1e6:>9.3f}s {dur / count / 1e3:>8.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,577 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+from harness import client, config, engine, metrics, repair, resilience, sections
+from harness import questions as question_store
+
+# Defaults
+QUEUE_PATH = os.environ.get("GMAT_QUEUE_PATH", config.path(".cache", "queue.sqlite"))
+LEASE_SECONDS = float(os.environ.get("GMAT_QUEUE_LEASE", 300))  # a job whose worker stops renewing it is leased again
+MAX_ATTEMPTS = int(os.environ.get("GMAT_QUEUE_ATTEMPTS", 3))    # leases per job before it is dead-lettered
+RETRY_DELAY = 30.0       # wait before a failed job is leased again; doubles per attempt
+RETRY_DELAY_MAX = 600.0
+IDLE_POLL = 2.0          # seconds an idle worker waits before asking again
+BUSY_TIMEOUT = 30.0      # seconds to wait for another process's write lock
+
+STATES = ["ready", "leased", "done", "dead", "paused"]
+
+
+# Dataset occurrence of every question, so repeated question_ids stay separate jobs
+def occurrences(questions):
+    seen = {}
+    for q in questions:
+        question_id = str(q["question_id"])
+        occurrence = seen.get(question_id, 0)
+        seen[question_id] = occurrence + 1
+        yield question_id, occurrence, q
+
+
+# Durable queue of evaluation jobs, one row per (section, model, prompt style,
+# question). Workers lease jobs in priority order; a lease that is not renewed
+# in time puts its job back in the queue, a failed job is retried with backoff
+# and a job that used up its attempts is dead-lettered. A finished job keeps
+# its record, so a restarted sweep never asks for it again.
+class WorkQueue:
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                section TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_style TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                occurrence INTEGER NOT NULL,
+                priority INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                max_attempts INTEGER NOT NULL,
+                available REAL NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                error TEXT,
+                record TEXT,
+                updated REAL NOT NULL,
+                UNIQUE (section, model, prompt_style, question_id, occurrence)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_next ON jobs (state, priority DESC, id)")
+
+    # Runs fn(conn) in one write transaction, so concurrent workers never lease the same job
+    def transaction(self, fn):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.conn)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return result
+
+    # Adds the plan's jobs in plan order. Jobs already queued keep their state;
+    # waiting ones take the new priority. Returns how many jobs were added.
+    def enqueue(self, section, questions, models, prompt_styles, priority=0, max_attempts=MAX_ATTEMPTS):
+        now = time.time()
+        rows = [(section.name, model, ps, question_id, occurrence, priority, max_attempts, now, now)
+                for model in models for ps in prompt_styles
+                for question_id, occurrence, _ in occurrences(section.select(questions))]
+
+        def add(conn):
+            before = conn.execute("SELECT COUNT(*) FROM jobs WHERE section = ?", (section.name,)).fetchone()[0]
+            conn.executemany("""
+                INSERT INTO jobs (section, model, prompt_style, question_id, occurrence, priority, state, attempts,
+                                  max_attempts, available, updated)
+                VALUES (?, ?, ?, ?, ?, ?, 'ready', 0, ?, ?, ?)
+                ON CONFLICT (section, model, prompt_style, question_id, occurrence)
+                DO UPDATE SET priority = excluded.priority WHERE state IN ('ready', 'paused')
+            """, rows)
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE section = ?", (section.name,)).fetchone()[0] - before
+
+        return self.transaction(add)
+
+    # Finished or dead jobs of these questions are queued again, e.g. after their dataset entry changed
+    def reset(self, section_name, question_ids):
+        question_ids = list(question_ids)
+        if not question_ids:
+            return 0
+        marks = ", ".join("?" * len(question_ids))
+        return self.transaction(lambda conn: conn.execute(
+            f"UPDATE jobs SET state = 'ready', attempts = 0, available = ?, error = NULL, record = NULL, updated = ? "
+            f"WHERE section = ? AND state IN ('done', 'dead') AND question_id IN ({marks})",
+            (time.time(), time.time(), section_name, *question_ids)).rowcount)
+
+    # Up to count jobs for worker, highest priority first. Expired leases are
+    # reclaimed first: their job is leased again, or dead-lettered when that
+    # lease was its last attempt. skip_models are models the worker has no free slot for.
+    def lease(self, worker, count=1, lease_seconds=LEASE_SECONDS, skip_models=(), section_names=None):
+        now = time.time()
+
+        def take(conn):
+            conn.execute("""
+                UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'ready' END,
+                                error = 'lease of ' || worker || ' expired', worker = NULL, lease_expires = NULL,
+                                updated = ?
+                WHERE state = 'leased' AND lease_expires < ?
+            """, (now, now))
+            sql = "SELECT id FROM jobs WHERE state = 'ready' AND available <= ?"
+            params = [now]
+            if skip_models:
+                sql += f" AND model NOT IN ({', '.join('?' * len(skip_models))})"
+                params.extend(skip_models)
+            if section_names:
+                sql += f" AND section IN ({', '.join('?' * len(section_names))})"
+                params.extend(section_names)
+            sql += " ORDER BY priority DESC, id LIMIT ?"
+            ids = [row[0] for row in conn.execute(sql, (*params, count))]
+            if not ids:
+                return []
+            marks = ", ".join("?" * len(ids))
+            conn.execute(f"UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                         f"updated = ? WHERE id IN ({marks})", (worker, now + lease_seconds, now, *ids))
+            rows = conn.execute(f"SELECT id, section, model, prompt_style, question_id, occurrence, attempts "
+                                f"FROM jobs WHERE id IN ({marks}) ORDER BY priority DESC, id", ids).fetchall()
+            keys = ("id", "section", "model", "prompt_style", "question_id", "occurrence", "attempts")
+            return [dict(zip(keys, row)) for row in rows]
+
+        return self.transaction(take)
+
+    # Extends worker's leases on job_ids; returns the ids it still holds
+    def renew(self, worker, job_ids, lease_seconds=LEASE_SECONDS):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        marks = ", ".join("?" * len(job_ids))
+
+        def extend(conn):
+            conn.execute(f"UPDATE jobs SET lease_expires = ? WHERE worker = ? AND state = 'leased' AND id IN ({marks})",
+                         (time.time() + lease_seconds, worker, *job_ids))
+            return [row[0] for row in conn.execute(
+                f"SELECT id FROM jobs WHERE worker = ? AND state = 'leased' AND id IN ({marks})", (worker, *job_ids))]
+
+        return self.transaction(extend)
+
+    # The first record to arrive wins, even from a worker whose lease expired meanwhile
+    def complete(self, job_id, record):
+        body = None if record is None else json.dumps(record, ensure_ascii=False)
+        return self.transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = 'done', record = ?, error = NULL, worker = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND state != 'done'", (body, time.time(), job_id)).rowcount == 1)
+
+    # Back to the queue after a growing delay, or dead-lettered once out of attempts (or when final)
+    def fail(self, job_id, worker, error, final=False):
+        now = time.time()
+
+        def retry(conn):
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND state = 'leased' AND worker = ?",
+                               (job_id, worker)).fetchone()
+            if row is None:
+                # Lease lost to another worker, which now owns the job
+                return None
+            attempts, max_attempts = row
+            state = "dead" if final or attempts >= max_attempts else "ready"
+            delay = min(RETRY_DELAY * 2 ** (attempts - 1), RETRY_DELAY_MAX)
+            conn.execute("UPDATE jobs SET state = ?, error = ?, available = ?, worker = NULL, lease_expires = NULL, "
+                         "updated = ? WHERE id = ?", (state, str(error), now + delay, now, job_id))
+            return state
+
+        return self.transaction(retry)
+
+    # A worker shutting down hands its leases back without spending an attempt
+    def release(self, worker):
+        return self.transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET state = 'ready', attempts = attempts - 1, worker = NULL, lease_expires = NULL, updated = ? "
+            "WHERE worker = ? AND state = 'leased'", (time.time(), worker)).rowcount)
+
+    def where(self, section_names=None, models=None):
+        clauses, params = [], []
+        for column, values in (("section", section_names), ("model", models)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        return "".join(f" AND {c}" for c in clauses), params
+
+    # Moves matching jobs from one state to another: pause, resume, retry the dead-lettered
+    def move(self, source, target, section_names=None, models=None):
+        sql, params = self.where(section_names, models)
+        extra = ", attempts = 0, error = NULL, available = 0" if source == "dead" else ""
+        return self.transaction(lambda conn: conn.execute(
+            f"UPDATE jobs SET state = ?, updated = ?{extra} WHERE state = ?{sql}",
+            (target, time.time(), source, *params)).rowcount)
+
+    def pause(self, section_names=None, models=None):
+        return self.move("ready", "paused", section_names, models)
+
+    def resume(self, section_names=None, models=None):
+        return self.move("paused", "ready", section_names, models)
+
+    def retry(self, section_names=None, models=None):
+        return self.move("dead", "ready", section_names, models)
+
+    # Jobs that can still be leased by someone: ready (possibly backing off) or leased
+    def pending(self, section_names=None):
+        sql, params = self.where(section_names)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM jobs WHERE state IN ('ready', 'leased'){sql}",
+                                     params).fetchone()[0]
+
+    # {section: {model: {state: count}}}
+    def stats(self):
+        counts = {}
+        with self.lock:
+            rows = self.conn.execute("SELECT section, model, state, COUNT(*) FROM jobs GROUP BY section, model, state "
+                                     "ORDER BY MIN(id)").fetchall()
+        for section_name, model, state, count in rows:
+            by_state = counts.setdefault(section_name, {}).setdefault(model, dict.fromkeys(STATES, 0))
+            by_state[state] = count
+        return counts
+
+    def dead(self, section_names=None):
+        sql, params = self.where(section_names)
+        with self.lock:
+            return self.conn.execute(f"SELECT section, model, prompt_style, question_id, attempts, error FROM jobs "
+                                     f"WHERE state = 'dead'{sql} ORDER BY id", params).fetchall()
+
+    # Models and prompt styles queued for a section, in the order they were enqueued
+    def sweep(self, section_name):
+        with self.lock:
+            models = [row[0] for row in self.conn.execute(
+                "SELECT model FROM jobs WHERE section = ? GROUP BY model ORDER BY MIN(id)", (section_name,))]
+            prompt_styles = [row[0] for row in self.conn.execute(
+                "SELECT prompt_style FROM jobs WHERE section = ? GROUP BY prompt_style ORDER BY MIN(id)",
+                (section_name,))]
+        return models, prompt_styles
+
+    def jobs(self, section_name):
+        with self.lock:
+            rows = self.conn.execute("SELECT question_id, occurrence, model, prompt_style, state, error, record "
+                                     "FROM jobs WHERE section = ? ORDER BY id", (section_name,)).fetchall()
+        keys = ("question_id", "occurrence", "model", "prompt_style", "state", "error", "record")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def clear(self, section_names=None):
+        sql, params = self.where(section_names)
+        return self.transaction(lambda conn: conn.execute(f"DELETE FROM jobs WHERE 1 = 1{sql}", params).rowcount)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# Builds a section's results from its finished and dead-lettered jobs, in plan
+# order. Returns (results, jobs still waiting or running).
+def collect(queue, section):
+    models, prompt_styles = queue.sweep(section.name)
+    questions = section.load()
+    selected = section.select(questions)
+    by_key = {(question_id, occurrence): q for question_id, occurrence, q in occurrences(selected)}
+    records = []
+    waiting = 0
+    for job in queue.jobs(section.name):
+        if job["state"] == "done":
+            if job["record"] is not None:
+                records.append(json.loads(job["record"]))
+        elif job["state"] == "dead":
+            # Counts towards the total, like any call that exhausted its retries
+            q = by_key.get((job["question_id"], job["occurrence"]))
+            if q is not None:
+                records.append(engine.failure_record(section, q, job["model"], job["prompt_style"], job["error"]))
+        else:
+            waiting += 1
+    tasks = engine.plan(section, selected, models, prompt_styles)
+    results = engine.build_results(section, questions, engine.from_journal(tasks, records), models, prompt_styles)
+    return results, waiting
+
+
+# One worker process: `concurrency` threads lease one job at a time, with at
+# most `per_model` jobs of any model in flight. A heartbeat renews the leases of
+# running jobs, so only a worker that died loses its jobs to others.
+class Worker:
+    def __init__(self, queue, name=None, concurrency=engine.MAX_CONCURRENCY,
+                 per_model=engine.PER_MODEL_CONCURRENCY, lease_seconds=LEASE_SECONDS, section_names=None,
+                 wait=False, verbose=True):
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.per_model = per_model
+        self.lease_seconds = lease_seconds
+        self.section_names = section_names
+        self.wait = wait
+        self.verbose = verbose
+        self.condition = threading.Condition()
+        self.running = {}  # job id -> model
+        self.stopping = threading.Event()
+        self.questions = {}
+        self.questions_lock = threading.Lock()
+        self.counts = {"done": 0, "retried": 0, "dead": 0}
+
+    def question(self, section, question_id, occurrence):
+        with self.questions_lock:
+            if section.name not in self.questions:
+                self.questions[section.name] = {(qid, occ): q for qid, occ, q in
+                                                occurrences(section.select(section.load()))}
+            return self.questions[section.name].get((question_id, occurrence))
+
+    def next_job(self):
+        with self.condition:
+            busy = {}
+            for model in self.running.values():
+                busy[model] = busy.get(model, 0) + 1
+            skip = [model for model, n in busy.items() if n >= self.per_model]
+            jobs = self.queue.lease(self.name, 1, self.lease_seconds, skip, self.section_names)
+            if jobs:
+                self.running[jobs[0]["id"]] = jobs[0]["model"]
+                return jobs[0]
+            return None
+
+    def finish(self, job):
+        with self.condition:
+            del self.running[job["id"]]
+            self.condition.notify_all()
+
+    def execute(self, job):
+        section = sections.get(job["section"])
+        model, ps = job["model"], job["prompt_style"]
+        q = self.question(section, job["question_id"], job["occurrence"])
+        if q is None:
+            self.queue.fail(job["id"], self.name, f"question {job['question_id']} is no longer in {section.dataset}",
+                            final=True)
+            self.counts["dead"] += 1
+            return
+        if self.verbose:
+            print(f"Evaluating Q{q['question_id']} ({section.name}) with {model} - {ps} "
+                  f"(attempt {job['attempts']})...")
+        try:
+            with metrics.evaluation(section.name) as calls:
+                record = section.evaluate(q, model, ps)
+        except Exception as e:
+            # CallFailed once the client's own retries ran out, or a bug in the section
+            state = self.queue.fail(job["id"], self.name, e)
+            self.counts["dead" if state == "dead" else "retried"] += 1
+            print(f"{'❌' if state == 'dead' else '⚠️ '} Q{q['question_id']} ({section.name}) with {model} - {ps}: {e}"
+                  + (" (dead-lettered)" if state == "dead" else " (queued again)"))
+            return
+        self.queue.complete(job["id"], metrics.annotate(record, calls))
+        self.counts["done"] += 1
+
+    def loop(self):
+        while not self.stopping.is_set():
+            job = self.next_job()
+            if job is None:
+                with self.condition:
+                    if not self.wait and not self.running and not self.queue.pending(self.section_names):
+                        self.condition.notify_all()
+                        return
+                    # A slot frees up, a retry's delay runs out or another process enqueues
+                    self.condition.wait(IDLE_POLL)
+                continue
+            try:
+                self.execute(job)
+            finally:
+                self.finish(job)
+
+    def heartbeat(self):
+        while not self.stopping.wait(self.lease_seconds / 3):
+            with self.condition:
+                held = list(self.running)
+            self.queue.renew(self.name, held, self.lease_seconds)
+
+    def run(self):
+        threads = [threading.Thread(target=self.loop, daemon=True) for _ in range(self.concurrency)]
+        beat = threading.Thread(target=self.heartbeat, daemon=True)
+        for thread in threads + [beat]:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(1.0)
+        finally:
+            self.stopping.set()
+            released = self.queue.release(self.name)
+            if released:
+                print(f"⚠️  Worker {self.name} stopped; {released} running jobs are back in the queue")
+        return self.counts
+
+
+def print_stats(queue):
+    stats = queue.stats()
+    if not stats:
+        print(f"Queue {queue.path} is empty")
+        return
+    print(f"{'section':<12} {'model':<20} " + " ".join(f"{state:>7}" for state in STATES))
+    for section_name, by_model in stats.items():
+        for model, by_state in by_model.items():
+            print(f"{section_name:<12} {model:<20} " + " ".join(f"{by_state[state]:>7}" for state in STATES))
+
+
+def enqueue_command(args):
+    queue = WorkQueue(args.path)
+    for name in args.sections:
+        section = sections.get(name)
+        store = question_store.get_store()
+        consumer = f"{os.path.abspath(queue.path)}#{section.name}"
+        changed, mark = store.pending_changes(section.dataset, consumer)
+        added = queue.enqueue(section, section.load(), args.models, args.prompt_styles, args.priority, args.attempts)
+        print(f"✅ {section.title}: {added} jobs added at priority {args.priority}")
+        if args.changed:
+            print(f"🔄 {section.title}: {queue.reset(section.name, changed)} jobs of {len(changed)} added or "
+                  f"changed questions queued again")
+        # A queue's first jobs are of the questions as they are now
+        store.take_changes(section.dataset, consumer, mark, first=not args.changed)
+    print_stats(queue)
+    queue.close()
+    return 0
+
+
+def work_command(args):
+    if args.processes > 1:
+        # Independent worker processes on this host share the request rate
+        env = dict(os.environ, GMAT_REQUESTS_PER_MINUTE=str(resilience.REQUESTS_PER_MINUTE / args.processes))
+        workers = [subprocess.Popen([sys.executable, "-m", "harness.workqueue", *worker_argv(args, i)], env=env,
+                                    cwd=config.ROOT) for i in range(args.processes)]
+        return max(worker.wait() for worker in workers)
+
+    queue = WorkQueue(args.path)
+    worker = Worker(queue, args.name, args.concurrency, args.per_model, args.lease, args.sections, args.wait)
+    start = time.perf_counter()
+    counts = worker.run()
+    print(f"Worker {worker.name}: {counts['done']} done, {counts['retried']} queued again, "
+          f"{counts['dead']} dead-lettered in {time.perf_counter() - start:.1f}s")
+    print(client.summary())
+    print(repair.summary())
+    print(metrics.summary())
+    if args.metrics:
+        print(f"📈 Call metrics written to {', '.join(metrics.export(args.metrics))}")
+    queue.close()
+    return 0
+
+
+# Arguments of one single-process worker of a work --processes N run
+def worker_argv(args, index):
+    argv = ["--path", args.path, "work", "--concurrency", str(args.concurrency), "--per-model", str(args.per_model),
+            "--lease", str(args.lease)]
+    if args.name:
+        argv += ["--name", f"{args.name}-{index}"]
+    if args.sections:
+        argv += ["--sections", *args.sections]
+    if args.wait:
+        argv.append("--wait")
+    if args.metrics:
+        argv += ["--metrics", f"{args.metrics}-{index}"]
+    return argv
+
+
+def status_command(args):
+    queue = WorkQueue(args.path)
+    print_stats(queue)
+    if args.dead:
+        for section_name, model, ps, question_id, attempts, error in queue.dead(args.sections):
+            print(f"❌ Q{question_id} ({section_name}) with {model} - {ps} after {attempts} attempts: {error}")
+    queue.close()
+    return 0
+
+
+def move_command(args):
+    queue = WorkQueue(args.path)
+    moved = getattr(queue, args.command)(args.sections, args.models)
+    print(f"{args.command.capitalize()}: {moved} jobs")
+    queue.close()
+    return 0
+
+
+def collect_command(args):
+    queue = WorkQueue(args.path)
+    status = 0
+    for name in args.sections or list(queue.stats()):
+        section = sections.get(name)
+        results, waiting = collect(queue, section)
+        if waiting and not args.partial:
+            print(f"⏳ {section.title}: {waiting} jobs still waiting or running; not saved (--partial saves anyway)")
+            status = 1
+            continue
+        section.save(results, section.partial_path() if waiting else None)
+    queue.close()
+    return status
+
+
+def clear_command(args):
+    queue = WorkQueue(args.path)
+    print(f"Removed {queue.clear(args.sections)} jobs from {queue.path}")
+    queue.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.workqueue",
+                                     description="Durable evaluation job queue shared by any number of workers")
+    parser.add_argument("--path", default=QUEUE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="queue every (model, prompt style, question) of a sweep")
+    enqueue_parser.add_argument("--sections", nargs="+", default=sections.DEFAULT_SECTIONS)
+    enqueue_parser.add_argument("--models", nargs="+", default=config.MODELS)
+    enqueue_parser.add_argument("--prompt-styles", nargs="+", default=config.PROMPT_STYLES)
+    enqueue_parser.add_argument("--priority", type=int, default=0, help="higher runs first; re-prioritizes waiting jobs")
+    enqueue_parser.add_argument("--attempts", type=int, default=MAX_ATTEMPTS, help="leases before a job is dead-lettered")
+    enqueue_parser.add_argument("--changed", action="store_true",
+                                help="queue again the questions dataset reloads added or changed since this queue last did")
+    enqueue_parser.set_defaults(func=enqueue_command)
+
+    work_parser = commands.add_parser("work", help="lease and evaluate jobs until the queue is drained")
+    work_parser.add_argument("--name", help="worker name shown on its leases (default host:pid)")
+    work_parser.add_argument("--sections", nargs="+", help="only take jobs of these sections")
+    work_parser.add_argument("--concurrency", type=int, default=engine.MAX_CONCURRENCY, help="jobs in flight")
+    work_parser.add_argument("--per-model", type=int, default=engine.PER_MODEL_CONCURRENCY,
+                             help="jobs in flight per model")
+    work_parser.add_argument("--lease", type=float, default=LEASE_SECONDS, help="lease length in seconds")
+    work_parser.add_argument("--processes", type=int, default=1, help="worker processes to start on this host")
+    work_parser.add_argument("--wait", action="store_true", help="keep polling once the queue is drained")
+    work_parser.add_argument("--metrics", help="write call metrics to METRICS.json and METRICS.prom")
+    work_parser.set_defaults(func=work_command)
+
+    status_parser = commands.add_parser("status", help="job counts per section, model and state")
+    status_parser.add_argument("--dead", action="store_true", help="also list dead-lettered jobs and their errors")
+    status_parser.add_argument("--sections", nargs="+")
+    status_parser.set_defaults(func=status_command)
+
+    for command, help_text in (("pause", "hold waiting jobs back from workers"),
+                               ("resume", "release paused jobs"),
+                               ("retry", "queue dead-lettered jobs again with fresh attempts")):
+        move_parser = commands.add_parser(command, help=help_text)
+        move_parser.add_argument("--sections", nargs="+")
+        move_parser.add_argument("--models", nargs="+")
+        move_parser.set_defaults(func=move_command)
+
+    collect_parser = commands.add_parser("collect", help="write each section's results file from its finished jobs")
+    collect_parser.add_argument("--sections", nargs="+", help="default: every section in the queue")
+    collect_parser.add_argument("--partial", action="store_true",
+                                help="save unfinished sections too, to their *.partial.json file")
+    collect_parser.set_defaults(func=collect_command)
+
+    clear_parser = commands.add_parser("clear", help="remove jobs from the queue")
+    clear_parser.add_argument("--sections", nargs="+", help="default: every job")
+    clear_parser.set_defaults(func=clear_command)
+
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command == "enqueue":
+        problem = sections.unsupported_styles(args.sections, args.prompt_styles)
+        if problem:
+            enqueue_parser.error(problem)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
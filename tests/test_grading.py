@@ -0,0 +1,40 @@
+from harness import grading
+
+
+def repaired_record():
+    return {
+        "question_id": 1,
+        "model": "gpt-4",
+        "prompt_style": "tree_of_thought",
+        "predicted": "C",
+        "correct_answer": "C",
+        "is_correct": True,
+        "explanation": "Statement (1) alone is sufficient, so the answer must be the third choice.",
+        "repair": {"model": "gpt-4", "response": "Answer: C"}
+    }
+
+
+def test_regrade_keeps_repaired_answer():
+    results = {"questions": [repaired_record()]}
+    changed, _ = grading.regrade_results(results, None)
+    assert changed == 0
+    assert results["questions"][0]["predicted"] == "C"
+    assert results["questions"][0]["is_correct"] is True
+
+
+def test_regrade_prefers_answer_in_explanation():
+    record = dict(repaired_record(), explanation="Answer: **D**", predicted="D", is_correct=False)
+    results = {"questions": [record]}
+    grading.regrade_results(results, None)
+    assert results["questions"][0]["predicted"] == "D"
+    assert results["questions"][0]["is_correct"] is False
+
+
+def test_truth_values_reads_each_statement():
+    assert grading.truth_values("Both Statements 1 and 2 are true, Statement 3 is false.", 3) == [True, True, False]
+    assert grading.truth_values("1: True, 2: False, 3: True", 3) == [True, False, True]
+
+
+def test_truth_values_leaves_unmentioned_statements_unknown():
+    assert grading.truth_values("Statement 1 is false", 3) == [False, None, None]
+    assert not grading.matches("Statement 1 is false", ["False", "True", "True"])